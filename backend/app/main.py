@@ -1,3 +1,7 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -5,9 +9,54 @@ from app.routes.generate import router as stl_router
 from app.routes.templates import router as template_router
 from app.routes.slice import router as slice_router
 from app.routes.runs import router as runs_router
+from app.services.slicer import (
+    MAX_CONCURRENT_SLICES,
+    get_slice_queue_stats,
+    validate_definitions,
+)
+from app.services.slice_jobs import start_slice_workers, stop_slice_workers
+from app.services.template_catalog import list_templates
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_caches() -> None:
+    """
+    Check the Cura definitions and build the template catalog, so the first
+    request is served hot. Validation lists (and caches) every profile too.
+    """
+    try:
+        # Surface a broken Cura installation at boot instead of on the first slice.
+        for problem in validate_definitions():
+            logger.error("Cura definition check failed: %s", problem)
+    except Exception:
+        logger.warning("Cura definition check failed to run", exc_info=True)
+
+    try:
+        list_templates()
+    except Exception:
+        logger.warning("Template catalog warmup failed", exc_info=True)
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    loop_type = type(asyncio.get_running_loop())
+    if not loop_type.__module__.startswith("uvloop"):
+        logger.warning(
+            "Running on %s.%s instead of uvloop; start uvicorn with --loop uvloop --http httptools",
+            loop_type.__module__,
+            loop_type.__name__,
+        )
+    await asyncio.to_thread(_warm_caches)
+
+    await start_slice_workers(MAX_CONCURRENT_SLICES)
+    try:
+        yield
+    finally:
+        await stop_slice_workers()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:3000",
@@ -28,6 +77,12 @@ def root():
     return {"message": "Backend is running ✅"}
 
 
+@app.get("/health")
+def health():
+    """Liveness probe that also exposes the CuraEngine slicing queue depth."""
+    return {"status": "ok", "slicing": get_slice_queue_stats()}
+
+
 app.include_router(stl_router)
 app.include_router(template_router)
 app.include_router(slice_router)
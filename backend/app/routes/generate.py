@@ -1,14 +1,15 @@
 from typing import Any, Dict, Optional
-from io import BytesIO
-import zipfile
 
 from fastapi import APIRouter, HTTPException, Response, Header
+from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
 from app.services.stl_generator import generate_stl, generate_multi_part_stls
 from app.services.user_template_generator import generate_stl_from_scad_code, validate_scad_code
 from app.services.template_catalog import get_template_metadata
 from app.services.job_history import record_run
+from app.services.utils import build_zip_archive
 
 
 class GenerateRequest(BaseModel):
@@ -38,7 +39,7 @@ router = APIRouter()
 
 
 @router.post("/generate-stl")
-def route_generate_stl(
+async def route_generate_stl(
     payload: GenerateRequest,
     user_id: Optional[str] = Header(None),
 ):
@@ -61,11 +62,12 @@ def route_generate_stl(
             raise HTTPException(status_code=400, detail=f"Invalid SCAD code: {validation_msg}")
         
         # Generate STL from SCAD code
-        stl_path = generate_stl_from_scad_code(payload.scad_code, payload.params)
+        stl_path = await run_in_threadpool(generate_stl_from_scad_code, payload.scad_code, payload.params)
         
         if stl_path and stl_path.exists():
             if payload.track_history:
-                record_run(
+                await run_in_threadpool(
+                    record_run,
                     {
                         "user_id": final_user_id,
                         "operation": "generate_stl",
@@ -90,7 +92,7 @@ def route_generate_stl(
                         ],
                     }
                 )
-            return Response(content=stl_path.read_bytes(), media_type="model/stl")
+            return FileResponse(stl_path, media_type="model/stl")
         
         raise HTTPException(status_code=500, detail="Failed to generate STL from SCAD code")
     
@@ -107,7 +109,8 @@ def route_generate_stl(
             raise HTTPException(status_code=400, detail="parts is required when multi_part=true")
 
         try:
-            stl_paths = generate_multi_part_stls(
+            stl_paths = await run_in_threadpool(
+                generate_multi_part_stls,
                 template["file"],
                 payload.params,
                 payload.parts,
@@ -116,13 +119,11 @@ def route_generate_stl(
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to generate multiple STLs: {str(e)}")
 
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-            for stl_path in stl_paths:
-                zf.writestr(stl_path.name, stl_path.read_bytes())
+        zip_bytes = await run_in_threadpool(build_zip_archive, stl_paths)
 
         if payload.track_history:
-            record_run(
+            await run_in_threadpool(
+                record_run,
                 {
                     "user_id": final_user_id,
                     "operation": "generate_stl",
@@ -151,14 +152,15 @@ def route_generate_stl(
 
         zip_name = f"{template['id']}-stls.zip"
         return Response(
-            content=zip_buffer.getvalue(),
+            content=zip_bytes,
             media_type="application/zip",
             headers={"Content-Disposition": f'attachment; filename="{zip_name}"'},
         )
     
-    stl_path = generate_stl(template["file"], payload.params)
+    stl_path = await run_in_threadpool(generate_stl, template["file"], payload.params)
     if payload.track_history:
-        record_run(
+        await run_in_threadpool(
+            record_run,
             {
                 "user_id": final_user_id,
                 "operation": "generate_stl",
@@ -183,4 +185,4 @@ def route_generate_stl(
                 ],
             }
         )
-    return Response(content=stl_path.read_bytes(), media_type="model/stl")
\ No newline at end of file
+    return FileResponse(stl_path, media_type="model/stl")
\ No newline at end of file
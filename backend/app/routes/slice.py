@@ -1,12 +1,15 @@
+import asyncio
+from functools import partial
 from typing import Any, Dict, Optional
-from io import BytesIO
-import zipfile
 import logging
 
 from fastapi import APIRouter, HTTPException, Response, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 
 from app.services.slicer import (
+    CuraEngineError,
     slice_stl_to_gcode, 
     slice_model, 
     list_settings_profiles,
@@ -15,13 +18,15 @@ from app.services.slicer import (
     list_material_presets,
     get_material_preset_settings,
     merge_settings,
-    normalize_settings,
+    resolve_slice_settings,
 )
 from app.services.template_catalog import get_template_metadata
 from app.services.user_template_generator import generate_stl_from_scad_code, validate_scad_code
 from pathlib import Path
 from app.services.stl_generator import generate_multi_part_stls
 from app.services.job_history import record_run
+from app.services.slice_jobs import get_slice_job, submit_slice_job
+from app.services.utils import build_zip_archive
 
 
 def _build_slice_repro_context(profile: str, overrides: Optional[Dict[str, Any]]) -> Dict[str, Any]:
@@ -33,8 +38,7 @@ def _build_slice_repro_context(profile: str, overrides: Optional[Dict[str, Any]]
         base_settings = {}
         printer_definition = None
 
-    merged = merge_settings(base_settings, overrides or {})
-    effective = normalize_settings(merged)
+    effective = resolve_slice_settings(base_settings, overrides)
 
     return {
         "profile": profile,
@@ -95,25 +99,23 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _gcode_response(gcode_path: Path) -> FileResponse:
+    """Send a G-code file straight from disk (sendfile where the server supports it)."""
+    return FileResponse(gcode_path, media_type="text/plain", filename=gcode_path.name)
+
+
 def _build_slice_overrides(payload: SliceRequest | SliceSTLRequest) -> Dict[str, Any]:
     overrides: Dict[str, Any] = dict(payload.slice_settings or {})
     material_settings = get_material_preset_settings(payload.material_preset)
     return merge_settings(material_settings, overrides)
 
 
-@router.post("/slice")
-def route_slice_model(
-    payload: SliceRequest,
-    user_id: Optional[str] = Header(None),
-):
+def _validate_slice_payload(payload: SliceRequest) -> Optional[Dict[str, Any]]:
     """
-    Generate G-code from either built-in template or pre-generated SCAD code.
+    Reject malformed /slice payloads up front.
+
+    Returns the template metadata for template_id payloads, or None for scad_code payloads.
     """
-    
-    # Use user_id from header if not in payload
-    final_user_id = payload.user_id or user_id
-    
-    # If SCAD code is provided, use it directly
     if payload.scad_code:
         if payload.multi_part:
             raise HTTPException(
@@ -125,92 +127,175 @@ def route_slice_model(
         is_valid, validation_msg = validate_scad_code(payload.scad_code)
         if not is_valid:
             raise HTTPException(status_code=400, detail=f"Invalid SCAD code: {validation_msg}")
-        
-        # Generate STL from SCAD code
-        stl_path = generate_stl_from_scad_code(payload.scad_code, payload.params)
-        if not stl_path or not stl_path.exists():
-            raise HTTPException(status_code=500, detail="Failed to generate STL from SCAD code")
-        
-        # Then slice the STL to G-code
-        try:
-            merged_slice_settings = _build_slice_overrides(payload)
-            repro = _build_slice_repro_context(payload.profile, merged_slice_settings)
-            gcode_path = slice_stl_to_gcode(
-                stl_path,
-                merged_slice_settings,
-                payload.profile
-            )
-            record_run(
-                {
-                    "user_id": final_user_id,
-                    "operation": "slice",
-                    "template_id": payload.template_id,
-                    "template_file": None,
-                    "template_source": "scad_code",
-                    "params": payload.params,
-                    "profile": repro["profile"],
-                    "slice_settings": payload.slice_settings,
-                    "material_preset": payload.material_preset,
-                    "effective_slice_settings": repro["effective_slice_settings"],
-                    "printer_definition": repro["printer_definition"],
-                    "multi_part": False,
-                    "parts": [],
-                    "part_selector_param": payload.part_selector_param,
-                    "outputs": [
-                        {
-                            "type": "stl",
-                            "filename": stl_path.name,
-                            "path": str(stl_path),
-                            "size_bytes": stl_path.stat().st_size,
-                        },
-                        {
-                            "type": "gcode",
-                            "filename": gcode_path.name,
-                            "path": str(gcode_path),
-                            "size_bytes": gcode_path.stat().st_size,
-                        },
-                    ],
-                }
-            )
-            return Response(
-                content=gcode_path.read_bytes(),
-                media_type="text/plain",
-                headers={
-                    "Content-Disposition": f'attachment; filename="{gcode_path.name}"'
-                }
-            )
-        except Exception as e:
-            logger.exception("Slicing failed for scad_code payload")
-            raise HTTPException(status_code=500, detail=f"Slicing failed: {str(e)}")
-    
-    # Otherwise use template_id (built-in templates)
+        return None
+
     if not payload.template_id:
         raise HTTPException(status_code=400, detail="Either template_id or scad_code is required")
-    
+
     template = get_template_metadata(payload.template_id)
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
 
-    if payload.multi_part:
-        if not payload.parts:
-            raise HTTPException(status_code=400, detail="parts is required when multi_part=true")
+    if payload.multi_part and not payload.parts:
+        raise HTTPException(status_code=400, detail="parts is required when multi_part=true")
+
+    return template
+
+
+async def _slice_scad_payload(payload: SliceRequest, final_user_id: Optional[str]) -> Path:
+    """Generate and slice a validated scad_code payload, recording the run."""
+    # Generate STL from SCAD code
+    stl_path = await run_in_threadpool(generate_stl_from_scad_code, payload.scad_code, payload.params)
+    if not stl_path or not stl_path.exists():
+        raise HTTPException(status_code=500, detail="Failed to generate STL from SCAD code")
 
+    # Then slice the STL to G-code
+    try:
+        merged_slice_settings = _build_slice_overrides(payload)
+        repro = await run_in_threadpool(_build_slice_repro_context, payload.profile, merged_slice_settings)
+        gcode_path = await slice_stl_to_gcode(
+            stl_path,
+            merged_slice_settings,
+            payload.profile
+        )
+        await run_in_threadpool(
+            record_run,
+            {
+                "user_id": final_user_id,
+                "operation": "slice",
+                "template_id": payload.template_id,
+                "template_file": None,
+                "template_source": "scad_code",
+                "params": payload.params,
+                "profile": repro["profile"],
+                "slice_settings": payload.slice_settings,
+                "material_preset": payload.material_preset,
+                "effective_slice_settings": repro["effective_slice_settings"],
+                "printer_definition": repro["printer_definition"],
+                "multi_part": False,
+                "parts": [],
+                "part_selector_param": payload.part_selector_param,
+                "outputs": [
+                    {
+                        "type": "stl",
+                        "filename": stl_path.name,
+                        "path": str(stl_path),
+                        "size_bytes": stl_path.stat().st_size,
+                    },
+                    {
+                        "type": "gcode",
+                        "filename": gcode_path.name,
+                        "path": str(gcode_path),
+                        "size_bytes": gcode_path.stat().st_size,
+                    },
+                ],
+            }
+        )
+        return gcode_path
+    except CuraEngineError as e:
+        # The message already carries the (truncated) engine output; no traceback needed.
+        logger.error("CuraEngine failed for scad_code payload: %s", e)
+        raise HTTPException(status_code=500, detail=f"Slicing failed: {e}")
+    except Exception as e:
+        logger.exception("Slicing failed for scad_code payload")
+        raise HTTPException(status_code=500, detail=f"Slicing failed: {str(e)}")
+
+
+async def _slice_template_payload(
+    payload: SliceRequest,
+    template: Dict[str, Any],
+    final_user_id: Optional[str],
+) -> Path:
+    """Generate and slice a validated single-part template payload, recording the run."""
+    try:
+        merged_slice_settings = _build_slice_overrides(payload)
+        repro = await run_in_threadpool(_build_slice_repro_context, payload.profile, merged_slice_settings)
+        stl_path, gcode_path = await slice_model(
+            template["file"],
+            payload.params,
+            merged_slice_settings,
+            payload.profile
+        )
+        await run_in_threadpool(
+            record_run,
+            {
+                "user_id": final_user_id,
+                "operation": "slice",
+                "template_id": template["id"],
+                "template_file": template["file"],
+                "template_source": "template_id",
+                "params": payload.params,
+                "profile": repro["profile"],
+                "slice_settings": payload.slice_settings,
+                "material_preset": payload.material_preset,
+                "effective_slice_settings": repro["effective_slice_settings"],
+                "printer_definition": repro["printer_definition"],
+                "multi_part": False,
+                "parts": [],
+                "part_selector_param": payload.part_selector_param,
+                "outputs": [
+                    {
+                        "type": "stl",
+                        "filename": stl_path.name,
+                        "path": str(stl_path),
+                        "size_bytes": stl_path.stat().st_size,
+                    },
+                    {
+                        "type": "gcode",
+                        "filename": gcode_path.name,
+                        "path": str(gcode_path),
+                        "size_bytes": gcode_path.stat().st_size,
+                    },
+                ],
+            }
+        )
+        return gcode_path
+    except CuraEngineError as e:
+        logger.error("CuraEngine failed for template payload: %s", e)
+        raise HTTPException(status_code=500, detail=f"Slicing failed: {e}")
+    except Exception as e:
+        logger.exception("Slicing failed for template payload")
+        raise HTTPException(status_code=500, detail=f"Slicing failed: {str(e)}")
+
+
+@router.post("/slice")
+async def route_slice_model(
+    payload: SliceRequest,
+    user_id: Optional[str] = Header(None),
+):
+    """
+    Generate G-code from either built-in template or pre-generated SCAD code.
+    """
+    
+    # Use user_id from header if not in payload
+    final_user_id = payload.user_id or user_id
+    template = _validate_slice_payload(payload)
+
+    # If SCAD code is provided, use it directly
+    if template is None:
+        return _gcode_response(await _slice_scad_payload(payload, final_user_id))
+
+    if payload.multi_part:
         try:
             merged_slice_settings = _build_slice_overrides(payload)
-            repro = _build_slice_repro_context(payload.profile, merged_slice_settings)
-            stl_paths = generate_multi_part_stls(
+            repro = await run_in_threadpool(_build_slice_repro_context, payload.profile, merged_slice_settings)
+            stl_paths = await run_in_threadpool(
+                generate_multi_part_stls,
                 template["file"],
                 payload.params,
                 payload.parts,
                 payload.part_selector_param,
             )
 
-            gcode_paths = [
-                slice_stl_to_gcode(stl_path, merged_slice_settings, payload.profile)
-                for stl_path in stl_paths
-            ]
+            # Parts are independent; slice them concurrently (bounded by the CuraEngine limit).
+            gcode_paths = list(
+                await asyncio.gather(
+                    *(slice_stl_to_gcode(stl_path, merged_slice_settings, payload.profile) for stl_path in stl_paths)
+                )
+            )
 
-            record_run(
+            await run_in_threadpool(
+                record_run,
                 {
                     "user_id": final_user_id,
                     "operation": "slice",
@@ -246,78 +331,68 @@ def route_slice_model(
                     ],
                 }
             )
+        except CuraEngineError as e:
+            logger.error("CuraEngine failed for multi_part payload: %s", e)
+            raise HTTPException(status_code=500, detail=f"Slicing failed: {e}")
         except Exception as e:
             logger.exception("Slicing failed for multi_part payload")
             raise HTTPException(status_code=500, detail=f"Slicing failed: {str(e)}")
 
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-            for gcode_path in gcode_paths:
-                zf.writestr(gcode_path.name, gcode_path.read_bytes())
+        zip_bytes = await run_in_threadpool(build_zip_archive, gcode_paths)
 
         zip_name = f"{template['id']}-gcodes.zip"
         return Response(
-            content=zip_buffer.getvalue(),
+            content=zip_bytes,
             media_type="application/zip",
             headers={"Content-Disposition": f'attachment; filename="{zip_name}"'},
         )
 
+    return _gcode_response(await _slice_template_payload(payload, template, final_user_id))
+
+
+@router.post("/slice/jobs", status_code=202)
+async def route_submit_slice_job(
+    payload: SliceRequest,
+    user_id: Optional[str] = Header(None),
+):
+    """
+    Queue a single-model slice and return its job id immediately.
+
+    Poll GET /slice/jobs/{job_id} until the G-code is ready.
+    """
+    final_user_id = payload.user_id or user_id
+    template = _validate_slice_payload(payload)
+    if payload.multi_part:
+        raise HTTPException(status_code=400, detail="multi_part is not supported for slice jobs")
+
+    if template is None:
+        run = partial(_slice_scad_payload, payload, final_user_id)
+    else:
+        run = partial(_slice_template_payload, payload, template, final_user_id)
+
     try:
-        merged_slice_settings = _build_slice_overrides(payload)
-        repro = _build_slice_repro_context(payload.profile, merged_slice_settings)
-        stl_path, gcode_path = slice_model(
-            template["file"],
-            payload.params,
-            merged_slice_settings,
-            payload.profile
-        )
-        record_run(
-            {
-                "user_id": final_user_id,
-                "operation": "slice",
-                "template_id": template["id"],
-                "template_file": template["file"],
-                "template_source": "template_id",
-                "params": payload.params,
-                "profile": repro["profile"],
-                "slice_settings": payload.slice_settings,
-                "material_preset": payload.material_preset,
-                "effective_slice_settings": repro["effective_slice_settings"],
-                "printer_definition": repro["printer_definition"],
-                "multi_part": False,
-                "parts": [],
-                "part_selector_param": payload.part_selector_param,
-                "outputs": [
-                    {
-                        "type": "stl",
-                        "filename": stl_path.name,
-                        "path": str(stl_path),
-                        "size_bytes": stl_path.stat().st_size,
-                    },
-                    {
-                        "type": "gcode",
-                        "filename": gcode_path.name,
-                        "path": str(gcode_path),
-                        "size_bytes": gcode_path.stat().st_size,
-                    },
-                ],
-            }
-        )
-        
-        return Response(
-            content=gcode_path.read_bytes(),
-            media_type="text/plain",
-            headers={
-                "Content-Disposition": f'attachment; filename="{gcode_path.name}"'
-            }
-        )
-    except Exception as e:
-        logger.exception("Slicing failed for template payload")
-        raise HTTPException(status_code=500, detail=f"Slicing failed: {str(e)}")
+        job_id = submit_slice_job(run)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/slice/jobs/{job_id}")
+async def route_get_slice_job(job_id: str):
+    """Return the job status, or the G-code once the job is done."""
+    job = get_slice_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Slice job not found")
+
+    if job["status"] == "done":
+        return _gcode_response(job["gcode_path"])
+
+    return job
 
 
 @router.post("/slice-stl")
-def route_slice_existing_stl(payload: SliceSTLRequest):
+async def route_slice_existing_stl(payload: SliceSTLRequest):
     """
     Slice an existing STL file to G-code using a settings profile.
     Returns the G-code file.
@@ -329,14 +404,15 @@ def route_slice_existing_stl(payload: SliceSTLRequest):
     
     try:
         merged_slice_settings = _build_slice_overrides(payload)
-        repro = _build_slice_repro_context(payload.profile, merged_slice_settings)
-        gcode_path = slice_stl_to_gcode(
-            stl_path, 
+        repro = await run_in_threadpool(_build_slice_repro_context, payload.profile, merged_slice_settings)
+        gcode_path = await slice_stl_to_gcode(
+            stl_path,
             merged_slice_settings,
             payload.profile
         )
 
-        record_run(
+        await run_in_threadpool(
+            record_run,
             {
                 "user_id": None,
                 "operation": "slice_stl",
@@ -369,13 +445,10 @@ def route_slice_existing_stl(payload: SliceSTLRequest):
             }
         )
         
-        return Response(
-            content=gcode_path.read_bytes(),
-            media_type="text/plain",
-            headers={
-                "Content-Disposition": f'attachment; filename="{gcode_path.name}"'
-            }
-        )
+        return _gcode_response(gcode_path)
+    except CuraEngineError as e:
+        logger.error("CuraEngine failed for existing STL: %s", e)
+        raise HTTPException(status_code=500, detail=f"Slicing failed: {e}")
     except Exception as e:
         logger.exception("Slicing existing STL failed")
         raise HTTPException(status_code=500, detail=f"Slicing failed: {str(e)}")
@@ -394,12 +467,12 @@ def get_profiles():
 
 
 @router.get("/profiles/{profile_name}")
-def get_profile(profile_name: str):
+async def get_profile(profile_name: str):
     """
     Get detailed settings for a specific profile.
     """
     try:
-        profile_data = get_profile_settings(profile_name)
+        profile_data = await run_in_threadpool(get_profile_settings, profile_name)
         return profile_data
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Profile not found")
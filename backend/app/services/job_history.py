@@ -5,7 +5,7 @@ from pathlib import Path
 from threading import Lock
 from typing import Any, Dict, List, Optional
 
-from app.services.utils import JOBS_DIR
+from app.services.utils import JOBS_DIR, json_loads
 
 HISTORY_FILE = JOBS_DIR / "run_history.jsonl"
 _HISTORY_LOCK = Lock()
@@ -43,13 +43,13 @@ def _read_all_runs() -> List[Dict[str, Any]]:
     records: List[Dict[str, Any]] = []
 
     with _HISTORY_LOCK:
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+        with open(HISTORY_FILE, "rb") as f:
             for raw_line in f:
                 line = raw_line.strip()
                 if not line:
                     continue
                 try:
-                    parsed = json.loads(line)
+                    parsed = json_loads(line)
                     if isinstance(parsed, dict):
                         records.append(parsed)
                 except Exception:
@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# Finished jobs beyond this count are forgotten, oldest first.
+MAX_TRACKED_JOBS = 1000
+
+_jobs: Dict[str, Dict[str, Any]] = {}
+_queue: Optional[asyncio.Queue] = None
+_workers: list[asyncio.Task] = []
+
+
+def submit_slice_job(run: Callable[[], Awaitable[Path]]) -> str:
+    """
+    Queue a slice for the background workers.
+
+    Args:
+        run: Zero-argument coroutine factory that produces the G-code path
+
+    Returns:
+        Job id to poll with get_slice_job
+    """
+    if _queue is None:
+        raise RuntimeError("Slice job workers are not running")
+
+    job_id = uuid.uuid4().hex
+    _jobs[job_id] = {"job_id": job_id, "status": "queued"}
+    _forget_finished_jobs()
+    _queue.put_nowait((job_id, run))
+    return job_id
+
+
+def get_slice_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return a snapshot of a job's state, or None if it is unknown."""
+    job = _jobs.get(job_id)
+    return dict(job) if job else None
+
+
+def _forget_finished_jobs() -> None:
+    excess = len(_jobs) - MAX_TRACKED_JOBS
+    if excess <= 0:
+        return
+    finished = [job_id for job_id, job in _jobs.items() if job["status"] in ("done", "failed")]
+    for job_id in finished[:excess]:
+        del _jobs[job_id]
+
+
+async def _worker(queue: asyncio.Queue) -> None:
+    while True:
+        job_id, run = await queue.get()
+        job = _jobs[job_id]
+        job["status"] = "running"
+        try:
+            gcode_path = await run()
+        except Exception as e:
+            # Route helpers raise HTTPException; surface its detail string as-is.
+            job.update(status="failed", error=str(getattr(e, "detail", None) or e))
+        else:
+            job.update(status="done", gcode_path=gcode_path)
+        finally:
+            queue.task_done()
+
+
+async def start_slice_workers(count: int) -> None:
+    """Start the worker tasks that drain the slice job queue."""
+    global _queue
+    _queue = asyncio.Queue()
+    _workers.extend(asyncio.create_task(_worker(_queue)) for _ in range(count))
+
+
+async def stop_slice_workers() -> None:
+    """Cancel the workers; queued jobs that have not started are dropped."""
+    global _queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
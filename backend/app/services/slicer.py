@@ -1,28 +1,89 @@
+import asyncio
+import copy
+import hashlib
+import mmap
 import uuid
-import subprocess
-import json
 import re
 import os
 import shutil
+import time
+from itertools import chain
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Set
 
+from app.services.stl_generator import generate_stl
 from app.services.utils import (
+    DIR_MTIME_RACY_NS,
     JOBS_DIR,
     SETTINGS_DIR,
     get_cura_resources_root,
+    json_dumps,
+    json_loads,
     load_json,
     normalize_values,
 )
 
-# Definitions live under resources/definitions in official Cura repo
-DEFINITIONS_DIR = get_cura_resources_root() / "definitions"
-# Extruders live under resources/extruders
-EXTRUDERS_DIR = get_cura_resources_root() / "extruders"
-# Quality profiles (inst.cfg) live under resources/quality
-# Note: CuraEngine expects JSON definition/resolved settings via -j/-r.
-#       .inst.cfg files are NOT JSON and cannot be passed to -j directly.
-QUALITY_DIR = get_cura_resources_root() / "quality"
+@dataclass(frozen=True, slots=True)
+class CuraPaths:
+    """Locations inside the Cura resources tree, resolved once at import."""
+
+    root: Path
+    # Definitions live under resources/definitions in official Cura repo
+    definitions: Path
+    # Extruders live under resources/extruders
+    extruders: Path
+    # Quality profiles (inst.cfg) live under resources/quality
+    # Note: CuraEngine expects JSON definition/resolved settings via -j/-r.
+    #       .inst.cfg files are NOT JSON and cannot be passed to -j directly.
+    quality: Path
+    # Ender-3 V3 KE uses this extruder definition in Cura 5.11
+    extruder_definition: Path
+
+    @classmethod
+    def from_root(cls, root: Path) -> "CuraPaths":
+        return cls(
+            root=root,
+            definitions=root / "definitions",
+            extruders=root / "extruders",
+            quality=root / "quality",
+            extruder_definition=root / "extruders" / "creality_base_extruder_0.def.json",
+        )
+
+
+CURA_PATHS = CuraPaths.from_root(get_cura_resources_root())
+
+# Base definitions every printer inherits from; resolved through the definition index.
+BASE_PRINTER_DEFINITION = "fdmprinter.def.json"
+BASE_EXTRUDER_DEFINITION = "fdmextruder.def.json"
+
+# Environment for CuraEngine so it can find definitions, materials and quality
+# profiles; built once since neither the process env nor the root changes.
+_CURA_ENV = {
+    **os.environ,
+    "CURA_ENGINE_SEARCH_PATH": str(CURA_PATHS.root),
+}
+
+# Printer used when a profile does not name one (or the profile is missing).
+DEFAULT_PRINTER_DEFINITION = "creality_ender3v3ke.def.json"
+
+# Cap concurrent CuraEngine processes (default: one per spare core) so bursts
+# of /slice requests queue on the event loop instead of oversubscribing CPUs.
+MAX_CONCURRENT_SLICES = int(os.getenv("MAX_CONCURRENT_SLICES", "0")) or max(1, (os.cpu_count() or 2) - 1)
+_slice_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SLICES)
+_slices_running = 0
+_slices_waiting = 0
+
+# Sliced G-code is cached in JOBS_DIR under a content hash of the STL and the
+# resolved settings; the least recently used entries are evicted past this size.
+SLICE_CACHE_PREFIX = "cache_"
+SLICE_CACHE_MAX_BYTES = int(os.getenv("SLICE_CACHE_MAX_BYTES", str(1024 ** 3)))
+
+# Settings overlays are content-addressed so identical requests share one file;
+# only the most recently used ones are kept.
+SETTINGS_OVERLAY_PREFIX = "settings_"
+SETTINGS_OVERLAY_MAX_FILES = int(os.getenv("SETTINGS_OVERLAY_MAX_FILES", "256"))
 
 
 MATERIAL_PRESETS: List[Dict[str, Any]] = [
@@ -96,9 +157,35 @@ MATERIAL_PRESETS: List[Dict[str, Any]] = [
 ]
 
 
+# Only the tail of CuraEngine's output is kept in errors; with -v it can run to megabytes.
+ENGINE_OUTPUT_TAIL_BYTES = 4096
+
+# Verbose engine logging is opt-in; the log of a successful run is then kept next
+# to the job as <job>.cura.log (failed runs keep their per-run log).
+CURA_ENGINE_VERBOSE = os.getenv("CURA_ENGINE_VERBOSE", "").lower() in ("1", "true", "yes")
+_VERBOSE_ARGS = ("-v",) if CURA_ENGINE_VERBOSE else ()
+
+
+class CuraEngineError(RuntimeError):
+    """CuraEngine is unavailable, exited non-zero, or produced no G-code."""
+
+    def __init__(self, message: str, returncode: Optional[int] = None):
+        super().__init__(message)
+        self.returncode = returncode
+
+
+class CuraDefinitionError(CuraEngineError):
+    """A printer definition file CuraEngine needs is missing from the Cura resources."""
+
+
 def _resolve_curaengine_binary() -> str:
     """Resolve the CuraEngine executable path reliably inside container/runtime."""
-    explicit = os.getenv("CURA_ENGINE_BIN")
+    return _find_curaengine_binary(os.getenv("CURA_ENGINE_BIN"))
+
+
+@lru_cache(maxsize=8)
+def _find_curaengine_binary(explicit: Optional[str]) -> str:
+    # Cached per CURA_ENGINE_BIN value so slices skip the stat/PATH probing; misses raise and are retried.
     if explicit:
         explicit_path = Path(explicit)
         if explicit_path.exists() and explicit_path.is_file():
@@ -116,7 +203,7 @@ def _resolve_curaengine_binary() -> str:
     if discovered:
         return discovered
 
-    raise FileNotFoundError(
+    raise CuraEngineError(
         "CuraEngine executable not found. Set CURA_ENGINE_BIN or ensure CuraEngine is installed in the backend container."
     )
 
@@ -159,7 +246,7 @@ def _get_definition_dirs() -> List[Path]:
                     paths.append(definitions_dir)
 
     # Bundled Cura resources (used as baseline/fallback).
-    paths.append(DEFINITIONS_DIR)
+    paths.append(CURA_PATHS.definitions)
 
     deduped: List[Path] = []
     seen: Set[str] = set()
@@ -175,18 +262,39 @@ def _get_definition_dirs() -> List[Path]:
     return deduped
 
 
-def _build_definition_index() -> Dict[str, Path]:
-    """
-    Build a definition-name to file-path index from all known definitions directories.
-    """
+def _scan_definition_dirs(stamped_dirs: tuple[tuple[Path, int], ...]) -> Dict[str, Path]:
     index: Dict[str, Path] = {}
-    for directory in _get_definition_dirs():
+    for directory, _mtime_ns in stamped_dirs:
         for def_path in sorted(directory.glob("*.def.json")):
             # Keep first match to preserve search priority.
             index.setdefault(def_path.name, def_path)
     return index
 
 
+_definition_index_cached = lru_cache(maxsize=4)(_scan_definition_dirs)
+
+
+def _build_definition_index() -> Dict[str, Path]:
+    """
+    Build a definition-name to file-path index from all known definitions directories.
+
+    The index is cached on the directories' mtimes and shared between callers,
+    so it must not be mutated.
+    """
+    stamped_dirs = []
+    for directory in _get_definition_dirs():
+        try:
+            stamped_dirs.append((directory, directory.stat().st_mtime_ns))
+        except OSError:
+            continue
+
+    now_ns = time.time_ns()
+    if any(now_ns - mtime_ns < DIR_MTIME_RACY_NS for _, mtime_ns in stamped_dirs):
+        # Too recent to trust the mtime as a version; scan without caching.
+        return _scan_definition_dirs(tuple(stamped_dirs))
+    return _definition_index_cached(tuple(stamped_dirs))
+
+
 def _normalize_definition_name(name: str) -> str:
     name = name.strip()
     if name.endswith(".def.json"):
@@ -198,6 +306,72 @@ def _resolve_definition_path(definition_name: str, definition_index: Dict[str, P
     return definition_index.get(_normalize_definition_name(definition_name))
 
 
+@lru_cache(maxsize=32)
+def _resolve_definition_stack(printer_definition: str) -> tuple[Path, Path, Path, Path]:
+    """
+    Resolve the (base printer, base extruder, extruder, printer) definition files
+    CuraEngine needs for a printer.
+
+    Successful lookups are cached; a missing file raises CuraDefinitionError and
+    is re-checked on the next call.
+    """
+    definition_index = _build_definition_index()
+    printer_def_path = _resolve_definition_path(printer_definition, definition_index)
+    base_def_path = _resolve_definition_path(BASE_PRINTER_DEFINITION, definition_index)
+    extruder_def_path = CURA_PATHS.extruder_definition
+    # Parent extruder definition referenced by the machine extruder
+    # Note: base fdmextruder is located under definitions in Cura resources
+    fdm_extruder_base_path = _resolve_definition_path(BASE_EXTRUDER_DEFINITION, definition_index)
+
+    # Sanity checks for all needed files (exclude .inst.cfg quality which isn't JSON)
+    for p in (base_def_path, printer_def_path, fdm_extruder_base_path, extruder_def_path):
+        if not p or not p.exists():
+            raise CuraDefinitionError(f"Required definition file not found: {p}")
+
+    return base_def_path, fdm_extruder_base_path, extruder_def_path, printer_def_path
+
+
+@lru_cache(maxsize=32)
+def _definition_args(printer_definition: str) -> tuple[str, ...]:
+    """CuraEngine "-j" arguments for a printer's definition stack, built once per printer."""
+    base_def_path, fdm_extruder_base_path, extruder_def_path, printer_def_path = (
+        _resolve_definition_stack(printer_definition)
+    )
+    return (
+        # Load base printer and base extruder first, then specific extruder, then printer
+        "-j", str(base_def_path),
+        "-j", str(fdm_extruder_base_path),
+        "-j", str(extruder_def_path),
+        "-j", str(printer_def_path),
+    )
+
+
+def validate_definitions() -> List[str]:
+    """
+    Resolve the definition stack for the default printer and every profile's printer.
+
+    Returns a list of problems (empty when every stack is complete) so startup
+    can report a broken Cura installation before the first slice request.
+    """
+    printer_definitions = {DEFAULT_PRINTER_DEFINITION}
+    for profile in list_settings_profiles():
+        printer_definitions.add(
+            profile.get("metadata", {}).get("printer_definition", DEFAULT_PRINTER_DEFINITION)
+        )
+
+    problems: List[str] = []
+    for printer_definition in sorted(printer_definitions):
+        try:
+            _resolve_definition_stack(printer_definition)
+        except CuraDefinitionError as e:
+            problems.append(f"{printer_definition}: {e}")
+    return problems
+
+
+# First numeric token in a setting value (e.g. "220", "220.0", "220mm").
+_NUMERIC_TOKEN_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
 def _to_float(value: Any) -> Optional[float]:
     if isinstance(value, (int, float)):
         return float(value)
@@ -207,8 +381,7 @@ def _to_float(value: Any) -> Optional[float]:
         if cleaned == "":
             return None
 
-        # Keep only the first numeric token (e.g. "220", "220.0", "220mm").
-        match = re.search(r"-?\d+(?:\.\d+)?", cleaned)
+        match = _NUMERIC_TOKEN_RE.search(cleaned)
         if not match:
             return None
 
@@ -237,7 +410,7 @@ def _resolve_inherited_override_value(
         if not current_path:
             break
 
-        current_json = _load_json(current_path)
+        current_json = load_json(current_path)
         if not current_json:
             break
 
@@ -288,8 +461,8 @@ def list_printers() -> List[Dict[str, Any]]:
         return printers
 
     ignored_files = {
-        "fdmprinter.def.json",
-        "fdmextruder.def.json",
+        BASE_PRINTER_DEFINITION,
+        BASE_EXTRUDER_DEFINITION,
         "fdmprinter_errata.def.json",
         "fdmextruder_errata.def.json",
     }
@@ -300,7 +473,7 @@ def list_printers() -> List[Dict[str, Any]]:
 
         def_path = definition_index[def_name]
 
-        def_json = _load_json(def_path)
+        def_json = load_json(def_path)
         if not def_json:
             continue
 
@@ -327,10 +500,6 @@ def list_printers() -> List[Dict[str, Any]]:
     return printers
 
 
-def _load_json(path: Path) -> Dict[str, Any]:
-    # Backward-compatible wrapper (use shared util)
-    return load_json(path)
-
 def _get_override_value(def_json: Dict[str, Any], name: str, default: Any) -> Any:
     """
     Read a setting's override value from a Cura machine definition JSON.
@@ -358,15 +527,7 @@ def load_settings_profile(profile_name: str = "balanced_profile") -> Dict[str, A
     Returns:
         Dictionary of settings
     """
-    profile_path = SETTINGS_DIR / f"{profile_name}.json"
-    
-    if not profile_path.exists():
-        raise FileNotFoundError(f"Settings profile not found: {profile_name}")
-    
-    with open(profile_path, 'r') as f:
-        profile_data = json.load(f)
-    
-    return profile_data.get("settings", {})
+    return get_profile_settings(profile_name).get("settings", {})
 
 
 def merge_settings(base_settings: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
@@ -378,12 +539,12 @@ def merge_settings(base_settings: Dict[str, Any], overrides: Dict[str, Any]) ->
         overrides: User-provided overrides
         
     Returns:
-        Merged settings dictionary
+        Merged settings dictionary. Without overrides this is ``base_settings``
+        itself, so callers must treat the result as read-only.
     """
-    merged = base_settings.copy()
-    if overrides:
-        merged.update(overrides)
-    return merged
+    if not overrides:
+        return base_settings
+    return base_settings | overrides
 
 
 def normalize_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
@@ -391,6 +552,25 @@ def normalize_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
     return normalize_values(settings, bool_to_lower=True, skip_none=True, skip_empty_str=True)
 
 
+def resolve_slice_settings(base_settings: Dict[str, Any], overrides: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge user overrides into base settings and normalize the result in a single pass.
+
+    Equivalent to ``normalize_settings(merge_settings(base_settings, overrides))``
+    (including key order) without building the intermediate merged dict.
+    """
+    overrides = overrides or {}
+    merged_items = chain(
+        ((key, overrides.get(key, value)) for key, value in base_settings.items()),
+        ((key, value) for key, value in overrides.items() if key not in base_settings),
+    )
+    return {
+        key: ("true" if value else "false") if value.__class__ is bool else value
+        for key, value in merged_items
+        if value is not None and not (isinstance(value, str) and not value.strip())
+    }
+
+
 def list_material_presets() -> List[Dict[str, Any]]:
     """List the curated material presets used by the slicing UI."""
     return [
@@ -413,6 +593,27 @@ def get_material_preset_settings(material_id: str) -> Dict[str, Any]:
     return {}
 
 
+# Temperature placeholders CuraEngine can leave unexpanded in the start G-code,
+# mapped to the settings (in priority order) that fill them.
+_TEMPERATURE_PLACEHOLDER_SOURCES = {
+    b"material_print_temperature_layer_0": ("material_print_temperature_layer_0",),
+    b"material_print_temperature": ("material_print_temperature",),
+    b"material_bed_temperature_layer_0": ("material_bed_temperature_layer_0", "material_bed_temperature"),
+    b"material_bed_temperature": ("material_bed_temperature",),
+}
+# All M104/M109/M140/M190 placeholders in one alternation so the file is scanned once.
+_TEMPERATURE_PLACEHOLDER_RE = re.compile(
+    rb"(M104|M109|M140|M190) S\{("
+    + b"|".join(re.escape(name) for name in _TEMPERATURE_PLACEHOLDER_SOURCES)
+    + rb")\}"
+)
+_APPLIED_BLOCK_START = "; --- APPLIED SLICER PRESET START ---"
+_APPLIED_BLOCK_END = "; --- APPLIED SLICER PRESET END ---"
+_APPLIED_BLOCK_MARKER = _APPLIED_BLOCK_START.encode("ascii")
+# Buffer size for streaming G-code through post-processing.
+_GCODE_IO_BUFFER = 1 << 20
+
+
 def _sanitize_gcode_comment_value(value: Any) -> str:
     return str(value).replace("\r", " ").replace("\n", " ").strip()
 
@@ -427,14 +628,13 @@ def _build_applied_settings_block(
     in the exported file and critical machine settings are explicitly set.
     """
     lines = [
-        "; --- APPLIED SLICER PRESET START ---",
+        _APPLIED_BLOCK_START,
         f"; profile={_sanitize_gcode_comment_value(profile)}",
         f"; printer_definition={_sanitize_gcode_comment_value(printer_definition)}",
     ]
-
-    for key in sorted(settings.keys()):
-        value = settings[key]
-        lines.append(f"; setting.{key}={_sanitize_gcode_comment_value(value)}")
+    lines.extend(
+        f"; setting.{key}={_sanitize_gcode_comment_value(settings[key])}" for key in sorted(settings)
+    )
 
     nozzle_temp = _to_float(
         settings.get("material_print_temperature_layer_0", settings.get("material_print_temperature"))
@@ -457,11 +657,269 @@ def _build_applied_settings_block(
     if print_speed is not None and print_speed > 0:
         lines.append(f"G1 F{int(round(print_speed * 60.0))}")
 
-    lines.append("; --- APPLIED SLICER PRESET END ---")
+    lines.append(_APPLIED_BLOCK_END)
     return "\n".join(lines) + "\n"
 
 
-def slice_stl_to_gcode(
+def _to_cura_setting_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+def _to_overlay_entries(settings: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    return {key: {"default_value": _to_cura_setting_value(value)} for key, value in settings.items()}
+
+
+def _build_settings_overlay(overrides: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Wrap resolved settings (as overlay entries) in a Cura definition whose
+    overrides replace the default values loaded from the printer definition stack.
+    """
+    return {
+        "name": "Resolved slice settings",
+        "overrides": overrides,
+    }
+
+
+def _write_settings_overlay(overlay_entries: Dict[str, Dict[str, str]]) -> Path:
+    """
+    Write the settings overlay under a name derived from its contents.
+
+    Identical resolved settings share one file, so repeat requests reuse it
+    instead of writing a fresh copy per job. Reuse bumps the mtime so the
+    overlay survives trimming as recently used.
+    """
+    payload = json_dumps(_build_settings_overlay(overlay_entries), sort_keys=True)
+    digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    settings_path = JOBS_DIR / f"{SETTINGS_OVERLAY_PREFIX}{digest}.json"
+    try:
+        os.utime(settings_path)
+    except FileNotFoundError:
+        tmp_path = settings_path.with_name(f"{settings_path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, settings_path)
+    return settings_path
+
+
+def _hash_file_contents(path: Path) -> bytes:
+    """Hash a (possibly very large) model file from the page cache without reading it into memory."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+        except ValueError:
+            pass  # Empty files can't be mapped and contribute nothing to the hash.
+    return digest.digest()
+
+
+def _slice_cache_key(
+    stl_path: Path,
+    profile: str,
+    profile_hash: str,
+    overrides: Dict[str, Any],
+    cleared_keys: List[str],
+) -> str:
+    """
+    Hash the STL contents together with everything that shapes the G-code output.
+
+    The base profile contributes its precomputed hash, so only the (small)
+    override dict is serialized per request.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_hash_file_contents(stl_path))
+    digest.update(
+        json_dumps(
+            {
+                "profile": profile,
+                "profile_hash": profile_hash,
+                "overrides": overrides,
+                "cleared": cleared_keys,
+            },
+            sort_keys=True,
+        )
+    )
+    return digest.hexdigest()
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    """
+    Hardlink source to target, copying only where hardlinks aren't supported.
+
+    Each job keeps its own G-code name (and survives cache eviction) without
+    duplicating the file's data.
+    """
+    tmp_path = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        os.link(source, tmp_path)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def _trim_slice_cache() -> None:
+    """
+    Evict least recently used cached G-code files once the cache exceeds its size
+    budget, and settings overlays beyond SETTINGS_OVERLAY_MAX_FILES.
+    """
+    overlays = []
+    for path in JOBS_DIR.glob(f"{SETTINGS_OVERLAY_PREFIX}*.json"):
+        try:
+            overlays.append((path.stat().st_mtime_ns, path))
+        except FileNotFoundError:
+            continue
+    overlays.sort(reverse=True)
+    for _, path in overlays[SETTINGS_OVERLAY_MAX_FILES:]:
+        path.unlink(missing_ok=True)
+
+    entries = []
+    for path in JOBS_DIR.glob(f"{SLICE_CACHE_PREFIX}*.gcode"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= SLICE_CACHE_MAX_BYTES:
+            break
+        path.unlink(missing_ok=True)
+        total_size -= size
+
+
+def get_slice_queue_stats() -> Dict[str, int]:
+    """Report CuraEngine concurrency: the limit, running slices and queued slices."""
+    return {
+        "limit": MAX_CONCURRENT_SLICES,
+        "running": _slices_running,
+        "waiting": _slices_waiting,
+    }
+
+
+def _read_log_tail(log_path: Path) -> str:
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - ENGINE_OUTPUT_TAIL_BYTES))
+            return f.read().strip().decode("utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+async def _run_curaengine(command: List[str], env: Dict[str, str], log_path: Path) -> int:
+    """
+    Run CuraEngine once a slot is free and return its exit code.
+
+    stdout is discarded and stderr goes straight to log_path, so engine
+    output is never buffered in memory.
+    """
+    global _slices_running, _slices_waiting
+
+    _slices_waiting += 1
+    try:
+        await _slice_semaphore.acquire()
+    finally:
+        _slices_waiting -= 1
+
+    _slices_running += 1
+    try:
+        with open(log_path, "wb") as log_file:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=log_file,
+                env=env,
+            )
+            try:
+                return await process.wait()
+            except asyncio.CancelledError:
+                # Don't leave an orphaned engine running once its slot is released.
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+                raise
+    finally:
+        _slices_running -= 1
+        _slice_semaphore.release()
+
+
+def _resolve_temperature_placeholders(settings: Dict[str, Any]) -> Dict[bytes, bytes]:
+    values: Dict[bytes, bytes] = {}
+    for placeholder, keys in _TEMPERATURE_PLACEHOLDER_SOURCES.items():
+        temp = next((t for t in (_to_float(settings.get(key)) for key in keys) if t is not None), None)
+        if temp is not None:
+            values[placeholder] = str(int(round(temp))).encode("ascii")
+    # The first-layer nozzle wait has always defaulted to 200 so M109 never stays unresolved.
+    values.setdefault(b"material_print_temperature_layer_0", b"200")
+    return values
+
+
+def _postprocess_gcode(
+    gcode_path: Path,
+    profile: str,
+    printer_definition: str,
+    final_settings: Dict[str, Any],
+) -> None:
+    """
+    Replace start-script temperature placeholders and stamp the applied settings.
+
+    The file is memory-mapped and searched in one C-level regex scan; when the
+    header is already present and no placeholder matches, nothing is rewritten.
+    Otherwise the untouched spans are copied from the mapping into a temp file
+    that replaces the original, so the G-code is never held in Python memory.
+    """
+    tmp_path = gcode_path.with_name(gcode_path.name + ".tmp")
+
+    def applied_block() -> bytes:
+        return _build_applied_settings_block(
+            profile=profile,
+            printer_definition=printer_definition,
+            settings=final_settings,
+        ).encode("utf-8")
+
+    try:
+        # Work on raw bytes: G-code is ASCII, so skip the decode/encode round trip.
+        with open(gcode_path, "rb") as src:
+            if os.fstat(src.fileno()).st_size == 0:
+                # Empty files can't be memory-mapped; the stamped file is just the header.
+                tmp_path.write_bytes(applied_block())
+            else:
+                with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # The applied block is always prepended, so only the head needs checking.
+                    needs_header = mm[:len(_APPLIED_BLOCK_MARKER)] != _APPLIED_BLOCK_MARKER
+                    matches = list(_TEMPERATURE_PLACEHOLDER_RE.finditer(mm))
+                    if not needs_header and not matches:
+                        return
+
+                    values = _resolve_temperature_placeholders(final_settings)
+                    with open(tmp_path, "wb", buffering=_GCODE_IO_BUFFER) as dst, memoryview(mm) as view:
+                        if needs_header:
+                            dst.write(applied_block())
+
+                        position = 0
+                        for match in matches:
+                            dst.write(view[position:match.start()])
+                            value = values.get(match.group(2))
+                            dst.write(match.group(0) if value is None else match.group(1) + b" S" + value)
+                            position = match.end()
+                        dst.write(view[position:])
+
+        os.replace(tmp_path, gcode_path)
+    except Exception:
+        pass
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+async def slice_stl_to_gcode(
     stl_path: Path,
     settings: Optional[Dict[str, Any]] = None,
     profile: str = "balanced_profile"
@@ -480,55 +938,16 @@ def slice_stl_to_gcode(
     job_id = stl_path.stem  # Use same job ID as the STL
     gcode_path = JOBS_DIR / f"{job_id}.gcode"
     
-    # Load base profile settings
-    try:
-        profile_data = get_profile_settings(profile)
-        base_settings = profile_data.get("settings", {})
-        # Prefer profile-specific printer definition if provided
-        printer_definition = profile_data.get("metadata", {}).get(
-            "printer_definition",
-            "creality_ender3v3ke.def.json",
-        )
-    except FileNotFoundError:
-        # Fallback to Cura official Ender 3 V3 KE if no local profile
-        base_settings = {}
-        printer_definition = "creality_ender3v3ke.def.json"
+    # Load the pre-normalized base profile settings (cached per profile revision)
+    base_settings, printer_definition, base_hash, base_entries = _load_normalized_profile(profile)
     
-    # Merge with user overrides
+    # Only the user overrides need normalizing per request (remove None/empty values, convert booleans).
+    # Overrides that normalize away clear the profile value, as merging before normalizing would.
     user_overrides = settings or {}
-    final_settings = merge_settings(base_settings, user_overrides)
-    
-    # Normalize settings (remove None/empty values, convert booleans)
-    final_settings = normalize_settings(final_settings)
-    
-    # Resolve definition stack for this printer
-    definition_index = _build_definition_index()
-    printer_def_path = _resolve_definition_path(printer_definition, definition_index)
-    base_def_path = _resolve_definition_path("fdmprinter.def.json", definition_index)
-    # Ender-3 V3 KE uses this extruder definition in Cura 5.11
-    extruder_def_path = EXTRUDERS_DIR / "creality_base_extruder_0.def.json"
-    # Parent extruder definition referenced by the machine extruder
-    # Note: base fdmextruder is located under definitions in Cura resources
-    fdm_extruder_base_path = _resolve_definition_path("fdmextruder.def.json", definition_index)
-
-    # Sanity checks for all needed files (exclude .inst.cfg quality which isn't JSON)
-    for p in (base_def_path, printer_def_path, fdm_extruder_base_path, extruder_def_path):
-        if not p or not p.exists():
-            raise FileNotFoundError(f"Required definition file not found: {p}")
-
-    # Build CuraEngine command with *all* definitions
-    cura_engine_bin = _resolve_curaengine_binary()
-    command = [
-        cura_engine_bin,
-        "slice",
-        "-v",
-        # Load base printer and base extruder first, then specific extruder, then printer
-        "-j", str(base_def_path),
-        "-j", str(fdm_extruder_base_path),
-        "-j", str(extruder_def_path),
-        "-j", str(printer_def_path),
-        "-o", str(gcode_path),
-    ]
+    override_settings = normalize_settings(user_overrides)
+    cleared_keys = sorted(user_overrides.keys() - override_settings.keys())
+    final_settings = {key: value for key, value in base_settings.items() if key not in cleared_keys}
+    final_settings.update(override_settings)
     
     # CuraEngine 5.12 introduces derived settings (e.g., roofing/flooring_*),
     # which are normally computed in the Cura frontend and provided via -r.
@@ -542,78 +961,98 @@ def slice_stl_to_gcode(
     if "layer_height" in final_settings and "layer_height_0" not in final_settings:
         final_settings["layer_height_0"] = final_settings["layer_height"]
 
-    # Add settings overrides as -s parameters
-    # The definition file provides all required defaults
-    for key, value in final_settings.items():
-        if isinstance(value, bool):
-            safe_val = str(value).lower()
-        elif isinstance(value, str):
-            safe_val = value.replace("\n", "\\n")
-        else:
-            safe_val = str(value)
-        command.extend(["-s", f"{key}={safe_val}"])
+    # Identical STL + settings produce identical G-code, so reuse a previous result.
+    cache_key = await asyncio.to_thread(
+        _slice_cache_key, stl_path, profile, base_hash, override_settings, cleared_keys
+    )
+    cached_gcode_path = JOBS_DIR / f"{SLICE_CACHE_PREFIX}{cache_key}.gcode"
+    if cached_gcode_path.exists():
+        try:
+            # Bump mtime so cache eviction treats this entry as recently used.
+            os.utime(cached_gcode_path)
+            _link_or_copy(cached_gcode_path, gcode_path)
+            return gcode_path
+        except FileNotFoundError:
+            pass  # Evicted between the check and the link; slice again.
+
+    # Definition stack arguments for this printer (validated once per printer)
+    definition_args = _definition_args(printer_definition)
+
+    # Write the resolved settings once as a definition overlay instead of
+    # passing one "-s key=value" pair per setting on the command line.
+    # Profile entries are pre-stringified per profile revision; only keys the
+    # request added, overrode or cleared-then-defaulted are converted here.
+    overlay_entries = {key: entry for key, entry in base_entries.items() if key not in cleared_keys}
+    changed = (final_settings.keys() - overlay_entries.keys()) | override_settings.keys()
+    overlay_entries.update(_to_overlay_entries({key: final_settings[key] for key in changed}))
+    settings_path = await asyncio.to_thread(_write_settings_overlay, overlay_entries)
+
+    # CuraEngine writes to fresh per-run files: gcode_path may be a hardlink to a
+    # cached result of an earlier slice, which must never be truncated in place,
+    # and concurrent slices of the same STL must not share a log.
+    run_id = uuid.uuid4().hex
+    engine_output_path = JOBS_DIR / f"{job_id}.{run_id}.partial.gcode"
+    log_path = JOBS_DIR / f"{job_id}.{run_id}.cura.log"
+
+    # Build CuraEngine command with *all* definitions
+    cura_engine_bin = _resolve_curaengine_binary()
+    command = [
+        cura_engine_bin,
+        "slice",
+        *_VERBOSE_ARGS,
+        *definition_args,
+        # Resolved profile + user settings override the printer defaults
+        "-j", str(settings_path),
+        "-o", str(engine_output_path),
+    ]
 
     # Load the model after settings so per-slice overrides are applied.
     command.extend(["-l", str(stl_path)])
     
-    # Set environment variable for CuraEngine to find definitions, materials, quality profiles
-    resources_root = get_cura_resources_root()
-    env = {
-        **subprocess.os.environ,
-        "CURA_ENGINE_SEARCH_PATH": str(resources_root),
-    }
-    
+    # Run CuraEngine with custom environment without blocking the event loop
     try:
-        # Run CuraEngine with custom environment
-        result = subprocess.run(
-            command,
-            check=True,
-            capture_output=True,
-            text=True,
-            env=env
-        )
-        
-        if not gcode_path.exists():
-            raise FileNotFoundError(f"G-code file not generated: {gcode_path}")
-        
-        # Post-process: Replace start-script placeholder and stamp applied settings
         try:
-            with open(gcode_path, 'r', encoding='utf-8', errors='ignore') as f:
-                gcode_text = f.read()
-            
-            temp = int(final_settings.get("material_print_temperature_layer_0", 200))
-            modified = gcode_text.replace(
-                "M109 S{material_print_temperature_layer_0}",
-                f"M109 S{temp}"
-            )
-
-            marker = "; --- APPLIED SLICER PRESET START ---"
-            if marker not in modified:
-                applied_block = _build_applied_settings_block(
-                    profile=profile,
-                    printer_definition=printer_definition,
-                    settings=final_settings,
+            returncode = await _run_curaengine(command, _CURA_ENV, log_path)
+
+            if returncode != 0:
+                # Decode just the tail so a failure storm doesn't build huge strings.
+                details = _read_log_tail(log_path) or "No output from CuraEngine"
+                raise CuraEngineError(
+                    f"CuraEngine slicing failed (exit code {returncode}). Command: {' '.join(command)}. Output: {details}",
+                    returncode=returncode,
                 )
-                modified = applied_block + modified
-            
-            if modified != gcode_text:
-                with open(gcode_path, 'w', encoding='utf-8') as f:
-                    f.write(modified)
-        except Exception:
-            pass
-        
-        return gcode_path
-        
-    except subprocess.CalledProcessError as e:
-        stderr = (e.stderr or "").strip()
-        stdout = (e.stdout or "").strip()
-        details = stderr or stdout or "No output from CuraEngine"
-        raise RuntimeError(
-            f"CuraEngine slicing failed (exit code {e.returncode}). Command: {' '.join(command)}. Output: {details}"
+
+            if not engine_output_path.exists():
+                raise CuraEngineError(f"G-code file not generated: {gcode_path}", returncode=returncode)
+
+            if CURA_ENGINE_VERBOSE:
+                os.replace(log_path, JOBS_DIR / f"{job_id}.cura.log")
+        finally:
+            # The error already carries the log tail; keep the full log only when asked to.
+            if not CURA_ENGINE_VERBOSE:
+                log_path.unlink(missing_ok=True)
+
+        await asyncio.to_thread(
+            _postprocess_gcode,
+            engine_output_path,
+            profile,
+            printer_definition,
+            final_settings,
         )
 
+        # Swap the finished file in (detaching any previous result linked to the job
+        # name), then publish it to the cache so a failed run never looks like a hit.
+        os.replace(engine_output_path, gcode_path)
+    finally:
+        engine_output_path.unlink(missing_ok=True)
+
+    await asyncio.to_thread(_link_or_copy, gcode_path, cached_gcode_path)
+    await asyncio.to_thread(_trim_slice_cache)
+
+    return gcode_path
 
-def slice_model(
+
+async def slice_model(
     template_name: str,
     params: Dict[str, Any],
     slice_settings: Optional[Dict[str, Any]] = None,
@@ -631,33 +1070,72 @@ def slice_model(
     Returns:
         Tuple of (stl_path, gcode_path)
     """
-    from app.services.stl_generator import generate_stl
-    
-    # Generate STL first
-    stl_path = generate_stl(template_name, params)
+    # Generate STL first (OpenSCAD runs in a worker thread)
+    stl_path = await asyncio.to_thread(generate_stl, template_name, params)
     
     # Slice to G-code
-    gcode_path = slice_stl_to_gcode(stl_path, slice_settings, profile)
+    gcode_path = await slice_stl_to_gcode(stl_path, slice_settings, profile)
     
     return stl_path, gcode_path
 
 
-def list_settings_profiles() -> list[Dict[str, Any]]:
+async def slice_models_batch(
+    jobs: List[tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]],
+    profile: str = "balanced_profile",
+) -> List[tuple[Path, Path]]:
     """
-    List all available settings profiles.
-    
+    Generate and slice several template variants concurrently.
+
+    Each job pipelines OpenSCAD into CuraEngine on its own, so one variant can
+    slice while another is still rendering. CuraEngine runs stay capped by
+    MAX_CONCURRENT_SLICES.
+
+    Args:
+        jobs: (template_name, params, slice_settings) per variant
+        profile: Name of the settings profile applied to every job
+
     Returns:
-        List of profile metadata
+        List of (stl_path, gcode_path) tuples in job order
     """
+    return list(
+        await asyncio.gather(
+            *(slice_model(template_name, params, slice_settings, profile)
+              for template_name, params, slice_settings in jobs)
+        )
+    )
+
+
+# (mtime_ns, size) of a profile file; an edit within one coarse mtime tick
+# still changes the version as long as the size changes.
+FileVersion = tuple[int, int]
+
+
+def _file_version(path: Path) -> FileVersion:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=64)
+def _load_profile_cached(profile_path: str, version: FileVersion) -> Dict[str, Any]:
+    """Parse a profile file once per (mtime, size) version."""
+    with open(profile_path, 'rb') as f:
+        return json_loads(f.read())
+
+
+# Snapshot of the parsed profile listing, keyed on (directory, (file name, version)
+# pairs) so GET /profiles only stats files until something changes.
+_profiles_snapshot: Optional[tuple[tuple[str, tuple[tuple[str, FileVersion], ...]], list[Dict[str, Any]]]] = None
+
+# Profile file names, rescanned only when SETTINGS_DIR's own mtime moves.
+_profile_dir_snapshot: Optional[tuple[tuple[str, int], list[Path]]] = None
+
+
+def _build_profile_listing(profile_files: list[tuple[Path, FileVersion]]) -> list[Dict[str, Any]]:
     profiles = []
-    
-    if not SETTINGS_DIR.exists():
-        return profiles
-    
-    for profile_file in SETTINGS_DIR.glob("*.json"):
+
+    for profile_file, version in profile_files:
         try:
-            with open(profile_file, 'r') as f:
-                profile_data = json.load(f)
+            profile_data = _load_profile_cached(str(profile_file), version)
             
             profiles.append({
                 "id": profile_file.stem,
@@ -675,10 +1153,97 @@ def list_settings_profiles() -> list[Dict[str, Any]]:
             p.get("name", "").lower(),
         )
     )
-    
+
     return profiles
 
 
+ProfileSnapshot = tuple[Dict[str, Any], str, str, Dict[str, Dict[str, str]]]
+
+
+@lru_cache(maxsize=64)
+def _normalized_profile_cached(profile_path: str, version: FileVersion) -> ProfileSnapshot:
+    """Normalize a profile revision once, fingerprint it and pre-build its overlay entries."""
+    profile_data = _load_profile_cached(profile_path, version)
+    settings = normalize_settings(profile_data.get("settings", {}))
+    # Prefer profile-specific printer definition if provided
+    printer_definition = profile_data.get("metadata", {}).get(
+        "printer_definition",
+        DEFAULT_PRINTER_DEFINITION,
+    )
+    return (
+        settings,
+        printer_definition,
+        _hash_profile(settings, printer_definition),
+        _to_overlay_entries(settings),
+    )
+
+
+def _hash_profile(settings: Dict[str, Any], printer_definition: str) -> str:
+    canonical = json_dumps(
+        {"printer_definition": printer_definition, "settings": settings},
+        sort_keys=True,
+    )
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+def _load_normalized_profile(profile_name: str) -> ProfileSnapshot:
+    """
+    Resolve a profile into (normalized settings, printer definition, settings hash,
+    Cura overlay entries).
+
+    The returned dicts are shared with the cache and must not be mutated.
+    """
+    profile_path = SETTINGS_DIR / f"{profile_name}.json"
+    try:
+        version = _file_version(profile_path)
+    except FileNotFoundError:
+        # Fallback to Cura official Ender 3 V3 KE if no local profile
+        return {}, DEFAULT_PRINTER_DEFINITION, _hash_profile({}, DEFAULT_PRINTER_DEFINITION), {}
+    return _normalized_profile_cached(str(profile_path), version)
+
+
+def list_settings_profiles() -> list[Dict[str, Any]]:
+    """
+    List all available settings profiles.
+
+    The parsed listing is cached until a profile file is added, removed or modified.
+    
+    Returns:
+        List of profile metadata
+    """
+    global _profiles_snapshot, _profile_dir_snapshot
+
+    try:
+        dir_mtime_ns = SETTINGS_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        return []
+
+    dir_key = (str(SETTINGS_DIR), dir_mtime_ns)
+    racy = time.time_ns() - dir_mtime_ns < DIR_MTIME_RACY_NS
+    if _profile_dir_snapshot is None or _profile_dir_snapshot[0] != dir_key or racy:
+        with os.scandir(SETTINGS_DIR) as entries:
+            paths = sorted(
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            )
+        _profile_dir_snapshot = (dir_key, paths)
+
+    # In-place edits don't touch the directory mtime, so known files are still
+    # stat'ed (but only re-read when their own mtime or size changed).
+    profile_files = []
+    for profile_file in _profile_dir_snapshot[1]:
+        try:
+            profile_files.append((profile_file, _file_version(profile_file)))
+        except FileNotFoundError:
+            continue
+
+    key = (str(SETTINGS_DIR), tuple((f.name, version) for f, version in profile_files))
+    if _profiles_snapshot is None or _profiles_snapshot[0] != key:
+        _profiles_snapshot = (key, _build_profile_listing(profile_files))
+
+    return copy.deepcopy(_profiles_snapshot[1])
+
+
 def get_profile_settings(profile_name: str) -> Dict[str, Any]:
     """
     Get the full settings from a profile.
@@ -691,8 +1256,10 @@ def get_profile_settings(profile_name: str) -> Dict[str, Any]:
     """
     profile_path = SETTINGS_DIR / f"{profile_name}.json"
     
-    if not profile_path.exists():
+    try:
+        version = _file_version(profile_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Settings profile not found: {profile_name}")
     
-    with open(profile_path, 'r') as f:
-        return json.load(f)
+    # Hand out a copy so callers can mutate it without poisoning the cache.
+    return copy.deepcopy(_load_profile_cached(str(profile_path), version))
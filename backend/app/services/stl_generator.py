@@ -1,48 +1,78 @@
+import os
 import uuid
+import shutil
 import subprocess
 import re
+from functools import lru_cache
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+from typing import Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 
 from app.services.utils import JOBS_DIR as DEFAULT_JOBS_DIR, TEMPLATES_DIR, normalize_values
 
 # Allow tests to override at module level
 JOBS_DIR = DEFAULT_JOBS_DIR
 
-env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+# Resolved once so every render execs OpenSCAD directly instead of searching PATH.
+OPENSCAD_BIN = os.getenv("OPENSCAD_BIN") or shutil.which("openscad") or "openscad"
+
+# One shared environment: compiled templates stay in memory and their bytecode
+# is cached on disk, so workers and restarts skip re-parsing. Templates are not
+# re-checked for changes on every render; restart the app to pick up edits.
+env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=False,
+    cache_size=400,
+)
+# Memoize lookups too, skipping Jinja's locked cache and loader on every render.
+_get_template = lru_cache(maxsize=64)(env.get_template)
+
+
+def run_openscad(scad_path: Path, stl_path: Path, timeout: Optional[float] = None) -> None:
+    """Render a SCAD file to STL with the OpenSCAD CLI installed in the container."""
+    subprocess.run(
+        [OPENSCAD_BIN, "-o", str(stl_path), str(scad_path)],
+        check=True,
+        timeout=timeout,
+    )
+
+
+_UNSAFE_SUFFIX_RE = re.compile(r"[^a-zA-Z0-9_-]+")
 
 
 def _safe_suffix(value: str) -> str:
-    sanitized = re.sub(r"[^a-zA-Z0-9_-]+", "_", value.strip())
+    sanitized = _UNSAFE_SUFFIX_RE.sub("_", value.strip())
     return sanitized[:48] or "part"
 
 
-def generate_stl(template_name: str, params: dict):
-    job_id = str(uuid.uuid4())
+def _to_scad_params(params: dict) -> dict:
+    """Convert Python booleans to lowercase strings for OpenSCAD; bool-free params pass through as is."""
+    if not any(isinstance(value, bool) for value in params.values()):
+        return params
+    return normalize_values(params, bool_to_lower=True, skip_none=False, skip_empty_str=False)
 
-    # Convert Python booleans to lowercase strings for OpenSCAD
-    scad_params = normalize_values(params, bool_to_lower=True, skip_none=False, skip_empty_str=False)
 
+def _render_stl(template: Template, scad_params: dict, stem: str) -> Path:
+    """Render a template to JOBS_DIR/<stem>.scad and export it to <stem>.stl."""
     # 1. Render SCAD
-    scad_path = JOBS_DIR / f"{job_id}.scad"
-    template = env.get_template(template_name)
+    scad_path = JOBS_DIR / f"{stem}.scad"
     scad_path.write_text(template.render(**scad_params))
 
     # 2. Run OpenSCAD CLI directly inside container
-    stl_path = JOBS_DIR / f"{job_id}.stl"
-    subprocess.run(
-        [
-            "openscad",
-            "-o",
-            str(stl_path),
-            str(scad_path),
-        ],
-        check=True,
-    )
+    stl_path = JOBS_DIR / f"{stem}.stl"
+    run_openscad(scad_path, stl_path)
 
     return stl_path
 
 
+def generate_stl(template_name: str, params: dict):
+    job_id = str(uuid.uuid4())
+
+    return _render_stl(_get_template(template_name), _to_scad_params(params), job_id)
+
+
 def generate_multi_part_stls(
     template_name: str,
     params: dict,
@@ -54,37 +84,17 @@ def generate_multi_part_stls(
 
     Example: selector_param=PART_MODE and parts=["bolt", "nut"].
     """
-    template = env.get_template(template_name)
+    template = _get_template(template_name)
     stl_paths: list[Path] = []
 
-    base_params = normalize_values(
-        params,
-        bool_to_lower=True,
-        skip_none=False,
-        skip_empty_str=False,
-    )
+    base_params = _to_scad_params(params)
 
     for part_name in parts:
         job_id = str(uuid.uuid4())
         safe_part = _safe_suffix(part_name)
 
-        scad_params = dict(base_params)
-        scad_params[selector_param] = part_name
-
-        scad_path = JOBS_DIR / f"{job_id}-{safe_part}.scad"
-        scad_path.write_text(template.render(**scad_params))
-
-        stl_path = JOBS_DIR / f"{job_id}-{safe_part}.stl"
-        subprocess.run(
-            [
-                "openscad",
-                "-o",
-                str(stl_path),
-                str(scad_path),
-            ],
-            check=True,
-        )
+        scad_params = {**base_params, selector_param: part_name}
 
-        stl_paths.append(stl_path)
+        stl_paths.append(_render_stl(template, scad_params, f"{job_id}-{safe_part}"))
 
     return stl_paths
\ No newline at end of file
@@ -1,6 +1,9 @@
-from typing import Any, Dict, List
+import os
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.services.utils import TEMPLATES_DIR
+from app.services.utils import DIR_MTIME_RACY_NS, TEMPLATES_DIR
 
 TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
     "cube_template.scad.j2": {
@@ -9,8 +12,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Cube",
         "dimensions": "Edge 20-150 mm",
         "description": "Dial precise cube dimensions, add chamfers, and export calibration blocks instantly.",
-        "parameters": ["CUBE_SIZE"],
-        "tags": ["Beginner", "Stable"],
+        "parameters": ("CUBE_SIZE",),
+        "tags": ("Beginner", "Stable"),
     },
     "cylinder_template.scad.j2": {
         "id": "cylinder",
@@ -18,8 +21,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Cylinder",
         "dimensions": "Ø 10-120 mm",
         "description": "Generate adapters, lids, and spacers with pitch-aware walls ready for printing.",
-        "parameters": ["HEIGHT", "DIAMETER", "SEGMENTS"],
-        "tags": ["Mechanical", "Reusable"],
+        "parameters": ("HEIGHT", "DIAMETER", "SEGMENTS"),
+        "tags": ("Mechanical", "Reusable"),
     },
     "pyramid_template.scad.j2": {
         "id": "pyramid",
@@ -27,8 +30,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Pyramid",
         "dimensions": "Base 25-200 mm",
         "description": "Architectural studies with tunable base sizes and apex heights for quick demos.",
-        "parameters": ["BASE_SIZE", "HEIGHT"],
-        "tags": ["Showcase", "Advanced"],
+        "parameters": ("BASE_SIZE", "HEIGHT"),
+        "tags": ("Showcase", "Advanced"),
     },
     "threaded_nut_bolt_template.scad.j2": {
         "id": "threaded_nut_bolt",
@@ -36,7 +39,7 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Multi-part Mechanical",
         "dimensions": "M6-M24 class, pitch-aware",
         "description": "Generate a matched bolt and nut pair from bolt-driven parameters only.",
-        "parameters": [
+        "parameters": (
             "BOLT_LENGTH",
             "THREAD_MAJOR_DIAMETER",
             "THREAD_PITCH",
@@ -44,8 +47,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
             "HEAD_HEIGHT",
             "HEAD_FLAT_DIAMETER",
             "SEGMENTS",
-        ],
-        "tags": ["Mechanical", "Advanced", "Multi-part"],
+        ),
+        "tags": ("Mechanical", "Advanced", "Multi-part"),
     },
     "box_template.scad.j2": {
         "id": "box",
@@ -53,8 +56,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Rectangular Prism",
         "dimensions": "W/L/D 20-200 mm",
         "description": "Create rectangular boxes with independent width, length, and depth values.",
-        "parameters": ["WIDTH", "LENGTH", "DEPTH"],
-        "tags": ["Beginner", "Utility"],
+        "parameters": ("WIDTH", "LENGTH", "DEPTH"),
+        "tags": ("Beginner", "Utility"),
     },
     "nozzle_adapter_template.scad.j2": {
         "id": "nozzle_adapter",
@@ -62,8 +65,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Tapered Hollow Cylinder",
         "dimensions": "Length + dual diameters",
         "description": "Hollow adapter with start diameter, tapered middle third, and end diameter.",
-        "parameters": ["DIAMETER_START", "DIAMETER_END", "LENGTH"],
-        "tags": ["Mechanical", "Adapter"],
+        "parameters": ("DIAMETER_START", "DIAMETER_END", "LENGTH"),
+        "tags": ("Mechanical", "Adapter"),
     },
     "hook_template.scad.j2": {
         "id": "hook",
@@ -71,8 +74,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Wall-Mounted Hook",
         "dimensions": "Height + reach + thickness",
         "description": "Generate a wall-mounted hook with a screw-hole backplate and reinforced arm.",
-        "parameters": ["HOOK_HEIGHT", "HOOK_REACH", "THICKNESS"],
-        "tags": ["Utility", "Beginner"],
+        "parameters": ("HOOK_HEIGHT", "HOOK_REACH", "THICKNESS"),
+        "tags": ("Utility", "Beginner"),
     },
     "gear_template.scad.j2": {
         "id": "gear",
@@ -80,8 +83,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Involute Gear",
         "dimensions": "Teeth + module + angle + thickness",
         "description": "Generate a printable spur gear using tooth count, module, pressure angle, and thickness.",
-        "parameters": ["TEETH_COUNT", "MODULE", "PRESSURE_ANGLE", "THICKNESS"],
-        "tags": ["Mechanical", "Advanced"],
+        "parameters": ("TEETH_COUNT", "MODULE", "PRESSURE_ANGLE", "THICKNESS"),
+        "tags": ("Mechanical", "Advanced"),
     },
     "hinge_template.scad.j2": {
         "id": "hinge",
@@ -89,8 +92,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Interleaved Barrel Hinge (Multi-part)",
         "dimensions": "Pin + length + knuckles",
         "description": "Generate a hinge body and matching pin as separate multi-part outputs.",
-        "parameters": ["PIN_DIAMETER", "LEAF_LENGTH", "KNUCKLE_COUNT"],
-        "tags": ["Mechanical", "Utility", "Multi-part"],
+        "parameters": ("PIN_DIAMETER", "LEAF_LENGTH", "KNUCKLE_COUNT"),
+        "tags": ("Mechanical", "Utility", "Multi-part"),
     },
     "threaded_container_template.scad.j2": {
         "id": "threaded_container",
@@ -98,8 +101,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Container + Cap",
         "dimensions": "Diameter + pitch + wall + height",
         "description": "Generate a threaded container body and matching cap from four core parameters.",
-        "parameters": ["DIAMETER", "PITCH", "WALL_THICKNESS", "HEIGHT"],
-        "tags": ["Mechanical", "Utility", "Container"],
+        "parameters": ("DIAMETER", "PITCH", "WALL_THICKNESS", "HEIGHT"),
+        "tags": ("Mechanical", "Utility", "Container"),
     },
     "spiral_vase_template.scad.j2": {
         "id": "spiral_vase",
@@ -107,8 +110,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Twisted Vase",
         "dimensions": "Twist + height + radius curve",
         "description": "Generate a twisted vase silhouette with wave-shaped radius control and closed base.",
-        "parameters": ["TWIST", "HEIGHT", "RADIUS_CURVE"],
-        "tags": ["Decorative", "Advanced"],
+        "parameters": ("TWIST", "HEIGHT", "RADIUS_CURVE"),
+        "tags": ("Decorative", "Advanced"),
     },
     "phone_stand_template.scad.j2": {
         "id": "phone_stand",
@@ -116,8 +119,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Desk Stand",
         "dimensions": "Width + thickness + height",
         "description": "Generate a sturdy angled desk stand with front lip and slanted back support.",
-        "parameters": ["PHONE_WIDTH", "PHONE_THICKNESS", "STAND_HEIGHT"],
-        "tags": ["Utility", "Beginner"],
+        "parameters": ("PHONE_WIDTH", "PHONE_THICKNESS", "STAND_HEIGHT"),
+        "tags": ("Utility", "Beginner"),
     },
     "ring_template.scad.j2": {
         "id": "ring",
@@ -125,8 +128,8 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "Torus Ring",
         "dimensions": "Inner Ø 16.5-24.6 mm (US sizes 4-14)",
         "description": "Generate custom rings by inner diameter and band width. Supports all common US ring sizes.",
-        "parameters": ["inner_diameter", "band_width", "ring_height"],
-        "tags": ["Jewelry", "Beginner", "Accessory"],
+        "parameters": ("inner_diameter", "band_width", "ring_height"),
+        "tags": ("Jewelry", "Beginner", "Accessory"),
     },
     "cable_clip_template.scad.j2": {
         "id": "cable_clip",
@@ -134,47 +137,114 @@ TEMPLATE_METADATA: Dict[str, Dict[str, Any]] = {
         "geometry": "C-shaped Clip",
         "dimensions": "Diameter + wall thickness",
         "description": "Generate a snap-on cable clip to organize and secure cable bundles of various diameters.",
-        "parameters": ["DIAMETER"],
-        "tags": ["Utility", "Beginner", "Organization"],
+        "parameters": ("DIAMETER",),
+        "tags": ("Utility", "Beginner", "Organization"),
     }
 }
 
 
+_TEMPLATE_SUFFIX = ".scad.j2"
+_TEMPLATE_SUFFIX_LEN = len(_TEMPLATE_SUFFIX)
+# Shared default for templates without parameters or tags.
+_EMPTY: Tuple[str, ...] = ()
+
+# ((TEMPLATES_DIR, mtime), templates, lookup index); rebuilt when the directory changes.
+_catalog_cache: Optional[Tuple[Tuple[str, int], List[Dict[str, Any]], Dict[str, Dict[str, Any]]]] = None
+
+
+def _resolve_template_entry(file_name: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    stem = file_name[:-_TEMPLATE_SUFFIX_LEN]
+    return {
+        "id": metadata.get("id", stem.replace("_template", "")),
+        "name": metadata.get("name", stem.replace("_", " ").title()),
+        "geometry": metadata.get("geometry", "Custom"),
+        "dimensions": metadata.get("dimensions", ""),
+        "description": metadata.get(
+            "description",
+            "Customize parameters and export STL + G-code instantly.",
+        ),
+        "parameters": metadata.get("parameters", _EMPTY),
+        "tags": metadata.get("tags", _EMPTY),
+        "file": file_name,
+    }
+
+
+# Built-in templates are resolved once at import; catalog rebuilds reuse these
+# entries, so only unknown files need their defaults derived.
+_KNOWN_TEMPLATE_ENTRIES: Dict[str, Dict[str, Any]] = {
+    file_name: _resolve_template_entry(file_name, metadata)
+    for file_name, metadata in TEMPLATE_METADATA.items()
+}
+
+
+def _build_template_entry(file_name: str) -> Dict[str, Any]:
+    entry = _KNOWN_TEMPLATE_ENTRIES.get(file_name)
+    if entry is None:
+        entry = _resolve_template_entry(file_name, {})
+    return entry
+
+
+def _build_template_index(templates: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Map every accepted spelling (id, file name, file stem) to its template.
+
+    The first template claiming a key wins, as with a linear scan in list order.
+    """
+    index: Dict[str, Dict[str, Any]] = {}
+    for template in templates:
+        file_name = template["file"].lower()
+        for alias in (template["id"].lower(), file_name, file_name[:-_TEMPLATE_SUFFIX_LEN]):
+            index.setdefault(alias, template)
+    return index
+
+
+def _load_catalog() -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    global _catalog_cache
+
+    try:
+        mtime_ns = TEMPLATES_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        return [], {}
+
+    key = (str(TEMPLATES_DIR), mtime_ns)
+    racy = time.time_ns() - mtime_ns < DIR_MTIME_RACY_NS
+    if _catalog_cache is None or _catalog_cache[0] != key or racy:
+        with os.scandir(TEMPLATES_DIR) as entries:
+            file_names = sorted(
+                entry.name for entry in entries
+                if entry.name.endswith(_TEMPLATE_SUFFIX) and entry.is_file()
+            )
+        templates = [_build_template_entry(name) for name in file_names]
+        _catalog_cache = (key, templates, _build_template_index(templates))
+        _lookup_template.cache_clear()
+
+    return _catalog_cache[1], _catalog_cache[2]
+
+
+def reset_caches() -> None:
+    """Drop the cached catalog and lookups so the next call rescans TEMPLATES_DIR."""
+    global _catalog_cache
+    _catalog_cache = None
+    _lookup_template.cache_clear()
+
+
 def list_templates() -> List[Dict[str, Any]]:
-    templates: List[Dict[str, Any]] = []
-
-    for template_file in sorted(TEMPLATES_DIR.glob("*.scad.j2")):
-        metadata = TEMPLATE_METADATA.get(template_file.name, {})
-        templates.append(
-            {
-                "id": metadata.get("id", template_file.stem.replace("_template", "")),
-                "name": metadata.get("name", template_file.stem.replace("_", " ").title()),
-                "geometry": metadata.get("geometry", "Custom"),
-                "dimensions": metadata.get("dimensions", ""),
-                "description": metadata.get(
-                    "description",
-                    "Customize parameters and export STL + G-code instantly.",
-                ),
-                "parameters": metadata.get("parameters", []),
-                "tags": metadata.get("tags", []),
-                "file": template_file.name,
-            }
-        )
-
-    return templates
+    """
+    List built-in templates.
 
+    Returns a new list on every call so callers can extend it; the template
+    dicts themselves are shared with the cache and must not be mutated.
+    """
+    return list(_load_catalog()[0])
 
-def get_template_metadata(template_id: str) -> Dict[str, Any] | None:
-    normalized_id = template_id.strip().lower()
 
-    for template in list_templates():
-        candidates = {
-            template["id"].lower(),
-            template["file"].lower(),
-            template["file"].replace(".scad.j2", "").lower(),
-        }
+@lru_cache(maxsize=64)
+def _lookup_template(template_id: str) -> Dict[str, Any] | None:
+    # Keyed on the raw request string; cleared whenever the catalog is rebuilt.
+    return _catalog_cache[2].get(template_id.strip().lower())
 
-        if normalized_id in candidates:
-            return template
 
-    return None
+def get_template_metadata(template_id: str) -> Dict[str, Any] | None:
+    if not _load_catalog()[1]:
+        return None
+    return _lookup_template(template_id)
@@ -12,6 +12,7 @@ import subprocess
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from app.services.stl_generator import run_openscad
 from app.services.utils import JOBS_DIR as DEFAULT_JOBS_DIR, normalize_values
 
 JOBS_DIR = DEFAULT_JOBS_DIR
@@ -55,11 +56,7 @@ def generate_stl_from_scad_code(
         
         # Run OpenSCAD to generate STL
         stl_path = JOBS_DIR / f"{job_id}.stl"
-        subprocess.run(
-            ["openscad", "-o", str(stl_path), str(scad_path)],
-            check=True,
-            timeout=30,
-        )
+        run_openscad(scad_path, stl_path, timeout=30)
         
         return stl_path
     
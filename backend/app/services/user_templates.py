@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
-from app.services.utils import JOBS_DIR
+from app.services.utils import JOBS_DIR, json_loads
 
 
 USER_TEMPLATES_DIR = Path(__file__).resolve().parents[1] / "user_templates"
@@ -82,14 +82,13 @@ def get_user_templates(user_id: str) -> List[Dict[str, Any]]:
             metadata_path = template_dir / "metadata.json"
             if metadata_path.exists():
                 try:
-                    with open(metadata_path, "r") as f:
-                        metadata = json.load(f)
-                        # Normalize parameters to match built-in template format
-                        # Convert from [{"name": "x", "type": "number", ...}] to ["x", "y", "z"]
-                        if "parameters" in metadata and isinstance(metadata["parameters"], list):
-                            if metadata["parameters"] and isinstance(metadata["parameters"][0], dict):
-                                metadata["parameters"] = [p["name"] for p in metadata["parameters"]]
-                        templates.append(metadata)
+                    metadata = json_loads(metadata_path.read_bytes())
+                    # Normalize parameters to match built-in template format
+                    # Convert from [{"name": "x", "type": "number", ...}] to ["x", "y", "z"]
+                    if "parameters" in metadata and isinstance(metadata["parameters"], list):
+                        if metadata["parameters"] and isinstance(metadata["parameters"][0], dict):
+                            metadata["parameters"] = [p["name"] for p in metadata["parameters"]]
+                    templates.append(metadata)
                 except Exception:
                     pass
     
@@ -110,14 +109,13 @@ def get_public_templates() -> List[Dict[str, Any]]:
                     metadata_path = template_dir / "metadata.json"
                     if metadata_path.exists():
                         try:
-                            with open(metadata_path, "r") as f:
-                                metadata = json.load(f)
-                                if metadata.get("isPublic", False):
-                                    # Normalize parameters to match built-in template format
-                                    if "parameters" in metadata and isinstance(metadata["parameters"], list):
-                                        if metadata["parameters"] and isinstance(metadata["parameters"][0], dict):
-                                            metadata["parameters"] = [p["name"] for p in metadata["parameters"]]
-                                    public_templates.append(metadata)
+                            metadata = json_loads(metadata_path.read_bytes())
+                            if metadata.get("isPublic", False):
+                                # Normalize parameters to match built-in template format
+                                if "parameters" in metadata and isinstance(metadata["parameters"], list):
+                                    if metadata["parameters"] and isinstance(metadata["parameters"][0], dict):
+                                        metadata["parameters"] = [p["name"] for p in metadata["parameters"]]
+                                public_templates.append(metadata)
                         except Exception:
                             pass
     
@@ -131,8 +129,7 @@ def get_user_template_metadata(user_id: str, template_id: str) -> Optional[Dict[
         return None
 
     try:
-        with open(metadata_path, "r") as f:
-            metadata = json.load(f)
+        metadata = json_loads(metadata_path.read_bytes())
     except Exception:
         return None
 
@@ -181,8 +178,7 @@ def update_template_metadata(
         return None
     
     try:
-        with open(metadata_path, "r") as f:
-            metadata = json.load(f)
+        metadata = json_loads(metadata_path.read_bytes())
         
         # Update allowed fields
         allowed_fields = {"name", "description", "tags", "isPublic"}
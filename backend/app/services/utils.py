@@ -1,13 +1,26 @@
-import os
 import json
+import os
+import zipfile
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback keeps the app importable without orjson
+    orjson = None
 
 # Shared directories
 JOBS_DIR = Path("/app/jobs")
 TEMPLATES_DIR = Path(__file__).resolve().parents[1] / "templates"
 SETTINGS_DIR = Path(__file__).resolve().parents[1] / "settings"
 
+# Directory listings are cached on the directory's mtime, except for directories
+# changed within this window: coarse filesystem timestamps can hide a second
+# add/remove in the same tick, so recent mtimes are not trusted as versions.
+DIR_MTIME_RACY_NS = 2_000_000_000
+
 
 def get_cura_resources_root() -> Path:
     """Resolve Cura resources root from environment, defaulting to /opt/cura-resources."""
@@ -15,15 +28,53 @@ def get_cura_resources_root() -> Path:
     return Path(root)
 
 
+def json_loads(data: bytes) -> Any:
+    """Parse a JSON document from bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, *, sort_keys: bool = False) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+@lru_cache(maxsize=1024)
+def _load_json_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    return json_loads(Path(path).read_bytes())
+
+
 def load_json(path: Path) -> Dict[str, Any]:
-    """Best-effort JSON loader returning empty dict on error."""
+    """
+    Best-effort JSON loader returning empty dict on error.
+
+    Documents are parsed once per (path, mtime, size) and the parsed dict is
+    shared between callers, so it must not be mutated.
+    """
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        stat = path.stat()
+        return _load_json_cached(str(path), stat.st_mtime_ns, stat.st_size)
     except Exception:
         return {}
 
 
+def reset_caches() -> None:
+    """Forget every parsed document cached by load_json."""
+    _load_json_cached.cache_clear()
+
+
+def build_zip_archive(paths: Iterable[Path]) -> bytes:
+    """Bundle files into an in-memory ZIP archive keyed by file name."""
+    zip_buffer = BytesIO()
+    with zipfile.ZipFile(zip_buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for path in paths:
+            zf.write(path, arcname=path.name)
+    return zip_buffer.getvalue()
+
+
 def normalize_values(
     data: Dict[str, Any],
     *,
@@ -37,6 +88,19 @@ def normalize_values(
     - Optionally skipping None values
     - Optionally skipping empty strings
     """
+    # The two flag combinations the app uses get a single comprehension each.
+    if bool_to_lower and skip_none and skip_empty_str:
+        return {
+            key: ("true" if value else "false") if value.__class__ is bool else value
+            for key, value in data.items()
+            if value is not None and not (isinstance(value, str) and not value.strip())
+        }
+    if bool_to_lower and not skip_none and not skip_empty_str:
+        return {
+            key: ("true" if value else "false") if value.__class__ is bool else value
+            for key, value in data.items()
+        }
+
     normalized: Dict[str, Any] = {}
     for key, value in data.items():
         if skip_none and value is None:
@@ -14,3 +14,13 @@ import pytest
 @pytest.fixture
 def client() -> TestClient:
     return _create_client()
+
+
+@pytest.fixture(autouse=True)
+def reset_service_caches():
+    """Start every test with empty template and JSON caches."""
+    from app.services import template_catalog, utils
+
+    template_catalog.reset_caches()
+    utils.reset_caches()
+    yield
@@ -8,4 +8,23 @@ def test_root_healthcheck():
     response = client.get("/")
 
     assert response.status_code == 200
-    assert response.json().get("message")
\ No newline at end of file
+    assert response.json().get("message")
+
+
+def test_health_reports_slice_queue():
+    client = TestClient(app)
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    slicing = response.json()["slicing"]
+    assert slicing["limit"] >= 1
+    assert slicing["running"] == 0
+    assert slicing["waiting"] == 0
+
+
+def test_startup_warms_template_catalog():
+    import app.services.template_catalog as catalog
+
+    assert catalog._catalog_cache is None
+    with TestClient(app):
+        assert catalog._catalog_cache is not None
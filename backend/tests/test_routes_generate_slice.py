@@ -1,5 +1,10 @@
+import time
 from pathlib import Path
 
+import pytest
+
+from app.services.slicer import CuraDefinitionError
+
 
 def test_generate_stl_requires_template_or_scad(client):
     response = client.post("/generate-stl", json={"params": {}})
@@ -71,7 +76,10 @@ def test_slice_success_with_template(client, monkeypatch, tmp_path: Path):
         "get_template_metadata",
         lambda _template_id: {"id": "cube", "file": "cube_template.scad.j2"},
     )
-    monkeypatch.setattr(slice_route, "slice_model", lambda *_args, **_kwargs: (stl_path, gcode_path))
+    async def fake_slice_model(*_args, **_kwargs):
+        return stl_path, gcode_path
+
+    monkeypatch.setattr(slice_route, "slice_model", fake_slice_model)
 
     recorded = []
     monkeypatch.setattr(slice_route, "record_run", lambda payload: recorded.append(payload))
@@ -83,6 +91,33 @@ def test_slice_success_with_template(client, monkeypatch, tmp_path: Path):
     assert recorded, "Expected run history to be recorded"
 
 
+@pytest.mark.parametrize(
+    "error",
+    [
+        FileNotFoundError(2, "No such file or directory", "openscad"),
+        CuraDefinitionError("Required definition file not found: fdmprinter.def.json"),
+    ],
+)
+def test_slice_reports_server_misconfiguration_as_500(client, monkeypatch, error):
+    import app.routes.slice as slice_route
+
+    monkeypatch.setattr(
+        slice_route,
+        "get_template_metadata",
+        lambda _template_id: {"id": "cube", "file": "cube_template.scad.j2"},
+    )
+
+    async def failing_slice_model(*_args, **_kwargs):
+        raise error
+
+    monkeypatch.setattr(slice_route, "slice_model", failing_slice_model)
+
+    response = client.post("/slice", json={"template_id": "cube", "params": {"CUBE_SIZE": 20}})
+
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Slicing failed:")
+
+
 def test_slice_applies_material_preset(client, monkeypatch, tmp_path: Path):
     import app.routes.slice as slice_route
 
@@ -99,7 +134,7 @@ def test_slice_applies_material_preset(client, monkeypatch, tmp_path: Path):
         lambda _template_id: {"id": "cube", "file": "cube_template.scad.j2"},
     )
 
-    def fake_slice_model(_file, _params, slice_settings, _profile):
+    async def fake_slice_model(_file, _params, slice_settings, _profile):
         captured["slice_settings"] = slice_settings
         return stl_path, gcode_path
 
@@ -149,3 +184,49 @@ def test_profiles_and_printers_endpoints(client, monkeypatch):
 
     assert materials_response.status_code == 200
     assert materials_response.json() == {"materials": [{"id": "preset"}]}
+
+
+def test_slice_job_is_queued_and_polled(monkeypatch, tmp_path: Path):
+    from fastapi.testclient import TestClient
+
+    import app.routes.slice as slice_route
+    from app.main import app
+
+    stl_path = tmp_path / "fake.stl"
+    gcode_path = tmp_path / "fake.gcode"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+    gcode_path.write_text(";gcode\nG1 X1 Y1\n", encoding="utf-8")
+
+    monkeypatch.setattr(
+        slice_route,
+        "get_template_metadata",
+        lambda _template_id: {"id": "cube", "file": "cube_template.scad.j2"},
+    )
+
+    async def fake_slice_model(*_args, **_kwargs):
+        return stl_path, gcode_path
+
+    monkeypatch.setattr(slice_route, "slice_model", fake_slice_model)
+    monkeypatch.setattr(slice_route, "record_run", lambda _payload: None)
+
+    # Entering the client runs the lifespan, which starts the job workers.
+    with TestClient(app) as client:
+        response = client.post("/slice/jobs", json={"template_id": "cube", "params": {"CUBE_SIZE": 20}})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        for _ in range(50):
+            result = client.get(f"/slice/jobs/{job_id}")
+            if result.headers["content-type"].startswith("text/plain"):
+                break
+            time.sleep(0.02)
+        assert result.status_code == 200
+        assert result.text.startswith(";gcode")
+
+        assert client.get("/slice/jobs/unknown").status_code == 404
+
+
+def test_slice_job_rejects_invalid_payload(client):
+    response = client.post("/slice/jobs", json={"params": {}})
+    assert response.status_code == 400
+    assert "Either template_id or scad_code" in response.json()["detail"]
@@ -0,0 +1,367 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+
+FAKE_CURA_ENGINE = """#!{python}
+import json
+import sys
+
+args = sys.argv[1:]
+output = args[args.index("-o") + 1]
+# Record every invocation next to the fake binary so tests can inspect it.
+with open(sys.argv[0] + ".calls.jsonl", "a") as f:
+    f.write(json.dumps(args) + "\\n")
+with open(output, "w") as f:
+    f.write(
+        ";FLAVOR:Marlin\\nM190 S{{material_bed_temperature_layer_0}}\\n"
+        "M104 S{{material_print_temperature}}\\nM109 S{{material_print_temperature_layer_0}}\\nG1 X1 Y1\\n"
+    )
+"""
+
+
+@pytest.fixture
+def fake_cura(monkeypatch, tmp_path: Path):
+    """Point the slicer at a throwaway definition stack and a fake CuraEngine binary."""
+    import app.services.slicer as slicer
+
+    definitions_dir = tmp_path / "definitions"
+    extruders_dir = tmp_path / "extruders"
+    jobs_dir = tmp_path / "jobs"
+    for directory in (definitions_dir, extruders_dir, jobs_dir):
+        directory.mkdir()
+
+    for name in ("fdmprinter.def.json", "fdmextruder.def.json", "creality_ender3v3ke.def.json"):
+        (definitions_dir / name).write_text(json.dumps({"name": name, "overrides": {}}), encoding="utf-8")
+    (extruders_dir / "creality_base_extruder_0.def.json").write_text("{}", encoding="utf-8")
+
+    engine = tmp_path / "CuraEngine"
+    engine.write_text(FAKE_CURA_ENGINE.format(python=sys.executable), encoding="utf-8")
+    engine.chmod(0o755)
+
+    monkeypatch.setenv("CURA_ENGINE_BIN", str(engine))
+    monkeypatch.setenv("CURA_DEFINITIONS_DIRS", str(definitions_dir))
+    monkeypatch.setattr(slicer, "CURA_PATHS", slicer.CuraPaths.from_root(tmp_path))
+    monkeypatch.setattr(slicer, "JOBS_DIR", jobs_dir)
+    slicer._resolve_definition_stack.cache_clear()
+    slicer._definition_args.cache_clear()
+
+    yield jobs_dir
+
+    slicer._resolve_definition_stack.cache_clear()
+    slicer._definition_args.cache_clear()
+
+
+def _engine_calls(jobs_dir: Path) -> list[list[str]]:
+    calls_log = jobs_dir.parent / "CuraEngine.calls.jsonl"
+    if not calls_log.exists():
+        return []
+    return [json.loads(line) for line in calls_log.read_text(encoding="utf-8").splitlines()]
+
+
+def test_slice_passes_settings_as_json_overlay(fake_cura: Path):
+    import app.services.slicer as slicer
+
+    stl_path = fake_cura / "job.stl"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+
+    gcode_path = asyncio.run(
+        slicer.slice_stl_to_gcode(
+            stl_path,
+            {"adhesion_type": "brim", "support_enable": True, "material_bed_temperature": None},
+        )
+    )
+
+    argv = _engine_calls(fake_cura)[-1]
+    assert "-s" not in argv
+    assert "-v" not in argv
+
+    settings_file = Path(argv[argv.index("-o") - 1])
+    overrides = json.loads(settings_file.read_text(encoding="utf-8"))["overrides"]
+    assert overrides["adhesion_type"] == {"default_value": "brim"}
+    assert overrides["support_enable"] == {"default_value": "true"}
+    assert overrides["layer_height_0"] == {"default_value": "0.2"}
+    # Untouched profile values come through from the cached profile overlay.
+    assert overrides["material_print_temperature"] == {"default_value": "215"}
+    # A blank override clears the profile value instead of falling back to it.
+    assert "material_bed_temperature" not in overrides
+
+    gcode = gcode_path.read_text(encoding="utf-8")
+    assert "; --- APPLIED SLICER PRESET START ---" in gcode
+    assert "M109 S215" in gcode
+    assert "M104 S215" in gcode
+    assert "M190 S60" in gcode
+    assert "{material_" not in gcode
+
+
+def test_cleared_setting_restored_by_default_reaches_overlay(monkeypatch, fake_cura: Path, tmp_path: Path):
+    import app.services.slicer as slicer
+
+    settings_dir = tmp_path / "settings"
+    settings_dir.mkdir()
+    (settings_dir / "custom_profile.json").write_text(
+        json.dumps({"settings": {"layer_height": 0.2, "layer_height_0": 0.3, "roofing_layer_count": 2}}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(slicer, "SETTINGS_DIR", settings_dir)
+    stl_path = fake_cura / "job.stl"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+
+    asyncio.run(
+        slicer.slice_stl_to_gcode(
+            stl_path, {"layer_height_0": "", "roofing_layer_count": None}, profile="custom_profile"
+        )
+    )
+
+    argv = _engine_calls(fake_cura)[-1]
+    overrides = json.loads(Path(argv[argv.index("-o") - 1]).read_text(encoding="utf-8"))["overrides"]
+    assert overrides["layer_height_0"] == {"default_value": "0.2"}
+    assert overrides["roofing_layer_count"] == {"default_value": "0"}
+
+
+def test_identical_slice_is_served_from_cache(fake_cura: Path):
+    import app.services.slicer as slicer
+
+    stl_path = fake_cura / "job.stl"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+
+    first = asyncio.run(slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "brim"}))
+    second = asyncio.run(slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "brim"}))
+    assert first == second
+    assert len(_engine_calls(fake_cura)) == 1
+
+    # A different job with the same STL gets its own name, hardlinked to the cached G-code.
+    other_stl = fake_cura / "other.stl"
+    other_stl.write_bytes(stl_path.read_bytes())
+    other = asyncio.run(slicer.slice_stl_to_gcode(other_stl, {"adhesion_type": "brim"}))
+    assert other.name == "other.gcode"
+    assert other.stat().st_ino == first.stat().st_ino
+    assert len(_engine_calls(fake_cura)) == 1
+
+    asyncio.run(slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "skirt"}))
+    assert len(_engine_calls(fake_cura)) == 2
+
+
+def test_reslicing_a_job_does_not_rewrite_earlier_cache_entries(fake_cura: Path):
+    import app.services.slicer as slicer
+
+    engine = fake_cura.parent / "CuraEngine"
+    engine.write_text(
+        f"#!{sys.executable}\n"
+        "import json, sys\n"
+        "args = sys.argv[1:]\n"
+        "output = args[args.index('-o') + 1]\n"
+        "overrides = json.load(open(args[args.index('-o') - 1]))['overrides']\n"
+        "with open(output, 'w') as f:\n"
+        "    f.write(';ADHESION=' + overrides['adhesion_type']['default_value'] + '\\n')\n",
+        encoding="utf-8",
+    )
+    stl_path = fake_cura / "job.stl"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+
+    brim = asyncio.run(slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "brim"}))
+    assert ";ADHESION=brim" in brim.read_text(encoding="utf-8")
+    skirt = asyncio.run(slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "skirt"}))
+    assert ";ADHESION=skirt" in skirt.read_text(encoding="utf-8")
+
+    # An identical STL under another job name hits the brim cache entry, which must be intact.
+    other_stl = fake_cura / "other.stl"
+    other_stl.write_bytes(stl_path.read_bytes())
+    other = asyncio.run(slicer.slice_stl_to_gcode(other_stl, {"adhesion_type": "brim"}))
+    assert ";ADHESION=brim" in other.read_text(encoding="utf-8")
+    assert not list(fake_cura.glob("*.partial.gcode"))
+
+
+def test_identical_settings_share_one_overlay_file(fake_cura: Path):
+    import app.services.slicer as slicer
+
+    for name in ("first.stl", "second.stl"):
+        (fake_cura / name).write_bytes(f"solid {name}\nendsolid\n".encode())
+        asyncio.run(slicer.slice_stl_to_gcode(fake_cura / name, {"adhesion_type": "brim"}))
+
+    first, second = _engine_calls(fake_cura)
+    assert first[first.index("-o") - 1] == second[second.index("-o") - 1]
+    assert len(list(fake_cura.glob(f"{slicer.SETTINGS_OVERLAY_PREFIX}*.json"))) == 1
+
+
+def test_settings_overlays_are_trimmed_to_most_recent(monkeypatch, fake_cura: Path):
+    import app.services.slicer as slicer
+
+    monkeypatch.setattr(slicer, "SETTINGS_OVERLAY_MAX_FILES", 2)
+    stl_path = fake_cura / "job.stl"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+
+    for adhesion in ("brim", "skirt", "raft"):
+        asyncio.run(slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": adhesion}))
+
+    overlays = list(fake_cura.glob(f"{slicer.SETTINGS_OVERLAY_PREFIX}*.json"))
+    assert len(overlays) == 2
+    last_call = _engine_calls(fake_cura)[-1]
+    assert Path(last_call[last_call.index("-o") - 1]) in overlays
+
+
+def test_validate_definitions_reports_missing_files(fake_cura: Path):
+    import app.services.slicer as slicer
+
+    assert slicer.validate_definitions() == []
+
+    (fake_cura.parent / "definitions" / "fdmextruder.def.json").unlink()
+    # Resolved stacks are cached for the life of the process.
+    assert slicer.validate_definitions() == []
+
+    slicer._resolve_definition_stack.cache_clear()
+    problems = slicer.validate_definitions()
+    assert problems
+    assert all("Required definition file not found" in problem for problem in problems)
+
+
+def test_engine_failure_reports_only_output_tail(fake_cura: Path):
+    import app.services.slicer as slicer
+
+    engine = fake_cura.parent / "CuraEngine"
+    engine.write_text(
+        f"#!{sys.executable}\nimport sys\nsys.stderr.write('x' * 100000 + 'TAIL')\nsys.exit(3)\n",
+        encoding="utf-8",
+    )
+    stl_path = fake_cura / "job.stl"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+
+    with pytest.raises(slicer.CuraEngineError) as excinfo:
+        asyncio.run(slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "brim"}))
+
+    assert excinfo.value.returncode == 3
+    message = str(excinfo.value)
+    assert message.endswith("TAIL")
+    assert message.count("x") <= slicer.ENGINE_OUTPUT_TAIL_BYTES
+    assert not list(fake_cura.glob("*.cura.log"))
+
+
+def test_cancelled_slice_kills_engine(fake_cura: Path):
+    import app.services.slicer as slicer
+
+    pid_file = fake_cura / "engine.pid"
+    engine = fake_cura.parent / "CuraEngine"
+    engine.write_text(
+        f"#!{sys.executable}\nimport os, time\n"
+        f"open({str(pid_file)!r}, 'w').write(str(os.getpid()))\ntime.sleep(30)\n",
+        encoding="utf-8",
+    )
+    stl_path = fake_cura / "job.stl"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+
+    async def slice_then_cancel():
+        task = asyncio.create_task(slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "brim"}))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(slice_then_cancel())
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+    assert slicer.get_slice_queue_stats()["running"] == 0
+
+
+def test_concurrent_failures_keep_their_own_engine_output(monkeypatch, fake_cura: Path):
+    import app.services.slicer as slicer
+
+    monkeypatch.setattr(slicer, "_slice_semaphore", asyncio.Semaphore(2))
+    engine = fake_cura.parent / "CuraEngine"
+    engine.write_text(
+        f"#!{sys.executable}\n"
+        "import json, sys, time\n"
+        "args = sys.argv[1:]\n"
+        "overrides = json.load(open(args[args.index('-o') - 1]))['overrides']\n"
+        "adhesion = overrides['adhesion_type']['default_value']\n"
+        "time.sleep(0.2 if adhesion == 'brim' else 0.05)\n"
+        "sys.stderr.write('failed with ' + adhesion)\n"
+        "sys.exit(3)\n",
+        encoding="utf-8",
+    )
+    stl_path = fake_cura / "job.stl"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+
+    async def slice_both():
+        return await asyncio.gather(
+            slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "brim"}),
+            slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "skirt"}),
+            return_exceptions=True,
+        )
+
+    brim_error, skirt_error = asyncio.run(slice_both())
+    assert str(brim_error).endswith("failed with brim")
+    assert str(skirt_error).endswith("failed with skirt")
+    assert not list(fake_cura.glob("*.cura.log"))
+
+
+def test_verbose_success_keeps_log_under_job_name(monkeypatch, fake_cura: Path):
+    import app.services.slicer as slicer
+
+    monkeypatch.setattr(slicer, "CURA_ENGINE_VERBOSE", True)
+    stl_path = fake_cura / "job.stl"
+    stl_path.write_bytes(b"solid fake\nendsolid fake\n")
+
+    asyncio.run(slicer.slice_stl_to_gcode(stl_path, {"adhesion_type": "brim"}))
+
+    assert [p.name for p in fake_cura.glob("*.cura.log")] == ["job.cura.log"]
+
+
+def test_batch_slices_overlap(monkeypatch, tmp_path: Path):
+    import app.services.slicer as slicer
+
+    running = 0
+    peak = 0
+
+    def fake_generate_stl(template_name, params):
+        path = tmp_path / f"{params['SIZE']}.stl"
+        path.write_bytes(b"solid fake\nendsolid fake\n")
+        return path
+
+    async def fake_slice(stl_path, settings=None, profile="balanced_profile"):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return stl_path.with_suffix(".gcode")
+
+    monkeypatch.setattr(slicer, "generate_stl", fake_generate_stl)
+    monkeypatch.setattr(slicer, "slice_stl_to_gcode", fake_slice)
+
+    jobs = [("cube_template.scad.j2", {"SIZE": size}, None) for size in (10, 20, 30)]
+    results = asyncio.run(slicer.slice_models_batch(jobs))
+
+    assert [stl.name for stl, _ in results] == ["10.stl", "20.stl", "30.stl"]
+    assert [gcode.name for _, gcode in results] == ["10.gcode", "20.gcode", "30.gcode"]
+    assert peak == 3
+
+
+def test_postprocess_leaves_finished_gcode_untouched(tmp_path: Path):
+    import app.services.slicer as slicer
+
+    gcode_path = tmp_path / "done.gcode"
+    gcode_path.write_bytes(b"; --- APPLIED SLICER PRESET START ---\nM109 S215\nG1 X1 Y1\n")
+    inode = gcode_path.stat().st_ino
+
+    slicer._postprocess_gcode(gcode_path, "balanced_profile", "printer.def.json", {})
+
+    assert gcode_path.stat().st_ino == inode
+    assert not gcode_path.with_name("done.gcode.tmp").exists()
+
+
+def test_postprocess_stamps_empty_gcode(tmp_path: Path):
+    import app.services.slicer as slicer
+
+    gcode_path = tmp_path / "empty.gcode"
+    gcode_path.write_bytes(b"")
+
+    slicer._postprocess_gcode(gcode_path, "balanced_profile", "printer.def.json", {"layer_height": 0.2})
+
+    assert gcode_path.read_bytes().startswith(b"; --- APPLIED SLICER PRESET START ---")
+    assert not gcode_path.with_name("empty.gcode.tmp").exists()
@@ -0,0 +1,104 @@
+import json
+import os
+from pathlib import Path
+
+
+def _write_profile(path: Path, name: str, layer_height: float, mtime_ns: int) -> None:
+    path.write_text(
+        json.dumps({"name": name, "settings": {"layer_height": layer_height}}),
+        encoding="utf-8",
+    )
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_profile_cache_invalidates_on_mtime_change(monkeypatch, tmp_path: Path):
+    import app.services.slicer as slicer
+
+    monkeypatch.setattr(slicer, "SETTINGS_DIR", tmp_path)
+    profile_path = tmp_path / "custom_profile.json"
+
+    _write_profile(profile_path, "Custom", 0.2, 1_000_000_000)
+    first = slicer.get_profile_settings("custom_profile")
+    assert first["settings"]["layer_height"] == 0.2
+
+    # Mutating the returned copy must not leak into the cache.
+    first["settings"]["layer_height"] = 9.9
+    assert slicer.get_profile_settings("custom_profile")["settings"]["layer_height"] == 0.2
+
+    _write_profile(profile_path, "Custom", 0.12, 2_000_000_000)
+    assert slicer.get_profile_settings("custom_profile")["settings"]["layer_height"] == 0.12
+
+
+def test_list_settings_profiles_picks_up_new_files(monkeypatch, tmp_path: Path):
+    import app.services.slicer as slicer
+
+    monkeypatch.setattr(slicer, "SETTINGS_DIR", tmp_path)
+
+    _write_profile(tmp_path / "a_profile.json", "Alpha", 0.2, 1_000_000_000)
+    assert [p["id"] for p in slicer.list_settings_profiles()] == ["a_profile"]
+
+    _write_profile(tmp_path / "b_profile.json", "Beta", 0.3, 1_000_000_000)
+    assert [p["id"] for p in slicer.list_settings_profiles()] == ["a_profile", "b_profile"]
+
+
+def test_list_settings_profiles_refreshes_on_edit(monkeypatch, tmp_path: Path):
+    import app.services.slicer as slicer
+
+    monkeypatch.setattr(slicer, "SETTINGS_DIR", tmp_path)
+    profile_path = tmp_path / "a_profile.json"
+
+    _write_profile(profile_path, "Alpha", 0.2, 1_000_000_000)
+    assert [p["name"] for p in slicer.list_settings_profiles()] == ["Alpha"]
+
+    _write_profile(profile_path, "Renamed", 0.2, 2_000_000_000)
+    assert [p["name"] for p in slicer.list_settings_profiles()] == ["Renamed"]
+
+
+def test_list_settings_profiles_skips_rescan_for_unchanged_directory(monkeypatch, tmp_path: Path):
+    import app.services.slicer as slicer
+
+    monkeypatch.setattr(slicer, "SETTINGS_DIR", tmp_path)
+    _write_profile(tmp_path / "a_profile.json", "Alpha", 0.2, 1_000_000_000)
+    os.utime(tmp_path, ns=(1_000_000_000, 1_000_000_000))
+
+    scans = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(slicer.os, "scandir", lambda path: scans.append(path) or real_scandir(path))
+
+    assert [p["id"] for p in slicer.list_settings_profiles()] == ["a_profile"]
+    assert [p["id"] for p in slicer.list_settings_profiles()] == ["a_profile"]
+    assert len(scans) == 1
+
+    _write_profile(tmp_path / "b_profile.json", "Beta", 0.3, 1_000_000_000)
+    assert [p["id"] for p in slicer.list_settings_profiles()] == ["a_profile", "b_profile"]
+    assert len(scans) == 2
+
+
+def test_resolve_slice_settings_matches_merge_then_normalize():
+    import app.services.slicer as slicer
+
+    base = {"layer_height": 0.2, "support_enable": False, "adhesion_type": "skirt", "infill": None}
+    overrides = {"support_enable": True, "adhesion_type": "  ", "infill_sparse_density": 20}
+
+    expected = slicer.normalize_settings(slicer.merge_settings(base, overrides))
+    assert slicer.resolve_slice_settings(base, overrides) == expected
+    assert list(slicer.resolve_slice_settings(base, overrides)) == list(expected)
+    assert slicer.resolve_slice_settings(base, {"infill": 15})["infill"] == 15
+    assert slicer.resolve_slice_settings(base, None) == slicer.normalize_settings(base)
+    assert base["support_enable"] is False
+
+
+def test_profile_edit_within_one_mtime_tick_is_picked_up(monkeypatch, tmp_path: Path):
+    import app.services.slicer as slicer
+
+    monkeypatch.setattr(slicer, "SETTINGS_DIR", tmp_path)
+    profile_path = tmp_path / "custom_profile.json"
+
+    _write_profile(profile_path, "Custom", 0.2, 1_000_000_000)
+    assert slicer.get_profile_settings("custom_profile")["settings"]["layer_height"] == 0.2
+    assert [p["name"] for p in slicer.list_settings_profiles()] == ["Custom"]
+
+    # Same mtime (coarse filesystem clock), different size.
+    _write_profile(profile_path, "Custom v2", 0.12, 1_000_000_000)
+    assert slicer.get_profile_settings("custom_profile")["settings"]["layer_height"] == 0.12
+    assert [p["name"] for p in slicer.list_settings_profiles()] == ["Custom v2"]
@@ -55,3 +55,19 @@ def test_generate_stl_succeeds(tmp_path: Path, template_name: str, params: dict)
     assert scad_path.exists(), "SCAD source file was not created"
     scad_text = scad_path.read_text(encoding="utf-8")
     assert len(scad_text) > 10, "SCAD file appears empty"
+
+
+def test_template_lookup_is_cached():
+    stl_gen = importlib.import_module("app.services.stl_generator")
+
+    first = stl_gen._get_template("cube_template.scad.j2")
+    assert stl_gen._get_template("cube_template.scad.j2") is first
+    assert "cube" in first.render(CUBE_SIZE=20, CENTERED="false")
+
+
+def test_scad_params_only_copied_when_booleans_present():
+    stl_gen = importlib.import_module("app.services.stl_generator")
+
+    params = {"CUBE_SIZE": 20, "CENTERED": "false"}
+    assert stl_gen._to_scad_params(params) is params
+    assert stl_gen._to_scad_params({"CUBE_SIZE": 20, "CENTERED": True}) == {"CUBE_SIZE": 20, "CENTERED": "true"}
@@ -0,0 +1,88 @@
+import os
+from pathlib import Path
+
+
+def test_template_lookup_accepts_id_file_and_stem():
+    from app.services.template_catalog import get_template_metadata
+
+    by_id = get_template_metadata("cube")
+    assert by_id is not None
+    assert get_template_metadata("cube_template.scad.j2") is by_id
+    assert get_template_metadata(" CUBE_TEMPLATE ") is by_id
+    assert get_template_metadata("does-not-exist") is None
+
+
+def test_template_catalog_refreshes_when_directory_changes(monkeypatch, tmp_path: Path):
+    import app.services.template_catalog as catalog
+
+    monkeypatch.setattr(catalog, "TEMPLATES_DIR", tmp_path)
+    (tmp_path / "cube_template.scad.j2").write_text("cube();", encoding="utf-8")
+    os.utime(tmp_path, ns=(1_000_000_000, 1_000_000_000))
+
+    templates = catalog.list_templates()
+    assert [t["id"] for t in templates] == ["cube"]
+    # Callers get their own list to extend.
+    templates.append({"id": "extra"})
+    assert [t["id"] for t in catalog.list_templates()] == ["cube"]
+
+    (tmp_path / "gear_template.scad.j2").write_text("cylinder();", encoding="utf-8")
+    os.utime(tmp_path, ns=(2_000_000_000, 2_000_000_000))
+    assert [t["id"] for t in catalog.list_templates()] == ["cube", "gear"]
+    assert catalog.get_template_metadata("gear")["file"] == "gear_template.scad.j2"
+
+
+def test_reset_caches_forces_rescan(monkeypatch, tmp_path: Path):
+    import app.services.template_catalog as catalog
+
+    monkeypatch.setattr(catalog, "TEMPLATES_DIR", tmp_path)
+    (tmp_path / "cube_template.scad.j2").write_text("cube();", encoding="utf-8")
+    os.utime(tmp_path, ns=(1_000_000_000, 1_000_000_000))
+    assert [t["id"] for t in catalog.list_templates()] == ["cube"]
+
+    # Same directory mtime: the cached catalog is served until it is cleared.
+    (tmp_path / "gear_template.scad.j2").write_text("cylinder();", encoding="utf-8")
+    os.utime(tmp_path, ns=(1_000_000_000, 1_000_000_000))
+    assert [t["id"] for t in catalog.list_templates()] == ["cube"]
+
+    catalog.reset_caches()
+    assert [t["id"] for t in catalog.list_templates()] == ["cube", "gear"]
+
+
+def test_known_template_entries_are_shared_across_rebuilds():
+    import app.services.template_catalog as catalog
+
+    first = catalog.get_template_metadata("cube")
+    catalog.reset_caches()
+    assert catalog.get_template_metadata("cube") is first
+    assert first["file"] == "cube_template.scad.j2"
+
+
+def test_unknown_template_defaults_derive_from_file_stem(monkeypatch, tmp_path: Path):
+    import app.services.template_catalog as catalog
+
+    monkeypatch.setattr(catalog, "TEMPLATES_DIR", tmp_path)
+    (tmp_path / "widget_template.scad.j2").write_text("cube();", encoding="utf-8")
+    os.utime(tmp_path, ns=(3_000_000_000, 3_000_000_000))
+
+    (widget,) = catalog.list_templates()
+    assert widget["id"] == "widget"
+    assert widget["name"] == "Widget Template"
+    assert catalog.get_template_metadata("widget_template") is widget
+
+
+def test_template_lookup_follows_catalog_rebuilds(monkeypatch, tmp_path: Path):
+    import app.services.template_catalog as catalog
+
+    monkeypatch.setattr(catalog, "TEMPLATES_DIR", tmp_path)
+    (tmp_path / "cube_template.scad.j2").write_text("cube();", encoding="utf-8")
+    os.utime(tmp_path, ns=(1_000_000_000, 1_000_000_000))
+    assert catalog.get_template_metadata("Cube")["id"] == "cube"
+    assert catalog.get_template_metadata("gear") is None
+
+    (tmp_path / "gear_template.scad.j2").write_text("cylinder();", encoding="utf-8")
+    os.utime(tmp_path, ns=(2_000_000_000, 2_000_000_000))
+    assert catalog.get_template_metadata("gear")["id"] == "gear"
+
+    (tmp_path / "cube_template.scad.j2").unlink()
+    os.utime(tmp_path, ns=(3_000_000_000, 3_000_000_000))
+    assert catalog.get_template_metadata("Cube") is None
@@ -0,0 +1,43 @@
+import json
+import os
+from pathlib import Path
+
+
+def test_load_json_parses_once_per_mtime(monkeypatch, tmp_path: Path):
+    import app.services.utils as utils
+
+    calls = []
+    real_json_loads = utils.json_loads
+    monkeypatch.setattr(utils, "json_loads", lambda data: calls.append(data) or real_json_loads(data))
+    utils.reset_caches()
+
+    definition = tmp_path / "printer.def.json"
+    definition.write_text(json.dumps({"name": "Printer A"}), encoding="utf-8")
+    os.utime(definition, ns=(1_000_000_000, 1_000_000_000))
+
+    assert utils.load_json(definition)["name"] == "Printer A"
+    assert utils.load_json(definition)["name"] == "Printer A"
+    assert len(calls) == 1
+
+    definition.write_text(json.dumps({"name": "Printer B"}), encoding="utf-8")
+    os.utime(definition, ns=(2_000_000_000, 2_000_000_000))
+    assert utils.load_json(definition)["name"] == "Printer B"
+    assert utils.load_json(tmp_path / "missing.def.json") == {}
+
+    utils.reset_caches()
+    assert utils.load_json(definition)["name"] == "Printer B"
+    assert len(calls) == 3
+
+
+def test_normalize_values_flag_combinations():
+    from app.services.utils import normalize_values
+
+    data = {"flag": True, "off": False, "none": None, "blank": "  ", "size": 20, "name": "brim"}
+
+    assert normalize_values(data) == {"flag": "true", "off": "false", "size": 20, "name": "brim"}
+    assert normalize_values(data, skip_none=False, skip_empty_str=False) == {
+        "flag": "true", "off": "false", "none": None, "blank": "  ", "size": 20, "name": "brim"
+    }
+    assert normalize_values(data, bool_to_lower=False, skip_empty_str=False) == {
+        "flag": True, "off": False, "blank": "  ", "size": 20, "name": "brim"
+    }